@@ -14,13 +14,45 @@ import json
 import time
 import random
 import threading
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 import logging
+import operator
+import queue
+import sys
 import uuid
 
+# 可选依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON 字节串，优先使用 orjson；默认输出紧凑格式"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """解析 UTF-8 JSON 字节串，优先使用 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class AlertSeverity(Enum):
     """告警严重级别枚举"""
@@ -61,7 +93,31 @@ class MetricType(Enum):
     AVAILABILITY = "availability"
 
 
-@dataclass
+# 预计算的枚举字符串，避免热路径上重复的属性访问和 str.upper
+_SEV_LABEL: Dict[AlertSeverity, str] = {s: s.value.upper() for s in AlertSeverity}
+_METRIC_NAME: Dict[MetricType, str] = {m: m.value for m in MetricType}
+
+# 告警条件运算符表，加载规则时解析一次
+_OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": lambda value, threshold: abs(value - threshold) < 0.001,
+    "!=": lambda value, threshold: abs(value - threshold) >= 0.001
+}
+
+# 告警历史和通知记录的时间键，用于二分查找时间窗口
+_FIRED_AT = operator.attrgetter("fired_at")
+_SENT_AT = operator.attrgetter("sent_at")
+
+
+def _never(value: float, threshold: float) -> bool:
+    """未知条件永不触发"""
+    return False
+
+
+@dataclass(slots=True)
 class AlertRule:
     """告警规则数据类"""
     id: str
@@ -75,9 +131,12 @@ class AlertRule:
     enabled: bool = True
     tags: Dict[str, str] = field(default_factory=dict)
     notification_channels: List[NotificationChannel] = field(default_factory=list)
+    op: Callable[[float, float], bool] = field(default=_never, init=False, repr=False, compare=False)
     
+    def __post_init__(self):
+        self.op = _OPS.get(self.condition, _never)
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """告警数据类"""
     id: str
@@ -100,7 +159,7 @@ class Alert:
     annotations: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class NotificationRecord:
     """通知记录数据类"""
     id: str
@@ -115,6 +174,85 @@ class NotificationRecord:
     retry_count: int = 0
 
 
+def _compile_alert_to_dict() -> Callable[[Any, Alert], Dict]:
+    """
+    根据 Alert 的字段生成专用的告警序列化方法
+    
+    生成的函数直接返回字典字面量：Enum 字段通过预建的 成员->驻留字符串 表取值，
+    datetime 字段转为 ISO 格式，可选 datetime 字段为空时输出 None。
+    字段表在导入时展开一次，调用时无反射开销。
+    """
+    namespace: Dict[str, Any] = {}
+    items = []
+    for f in fields(Alert):
+        attr = f"alert.{f.name}"
+        if f.type is datetime:
+            expr = f"{attr}.isoformat()"
+        elif f.type == Optional[datetime]:
+            expr = f"{attr}.isoformat() if {attr} else None"
+        elif isinstance(f.type, type) and issubclass(f.type, Enum):
+            table = f"_{f.name}_values"
+            namespace[table] = {member: sys.intern(member.value) for member in f.type}
+            expr = f"{table}[{attr}]"
+        else:
+            expr = attr
+        items.append(f"        {f.name!r}: {expr},")
+    
+    source = "def _alert_to_dict(self, alert):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    exec(source, namespace)
+    
+    func = namespace["_alert_to_dict"]
+    func.__doc__ = "将告警对象转换为字典"
+    return func
+
+
+class ShardedAlertStore(MutableMapping):
+    """按键哈希分片的活跃告警存储
+    
+    评估、随机告警、告警风暴和自动解决线程并发写入活跃告警，
+    分片后各线程的写入分散到不同的子字典，遍历时按分片做快照。
+    """
+    
+    SHARD_COUNT = 16  # 必须是2的幂
+    
+    def __init__(self):
+        self._shards: List[Dict[str, "Alert"]] = [{} for _ in range(self.SHARD_COUNT)]
+    
+    def _shard(self, key: str) -> Dict[str, "Alert"]:
+        return self._shards[hash(key) & (self.SHARD_COUNT - 1)]
+    
+    def __getitem__(self, key: str) -> "Alert":
+        return self._shard(key)[key]
+    
+    def __setitem__(self, key: str, alert: "Alert"):
+        self._shard(key)[key] = alert
+    
+    def __delitem__(self, key: str):
+        del self._shard(key)[key]
+    
+    def __contains__(self, key) -> bool:
+        return key in self._shard(key)
+    
+    def __iter__(self):
+        for shard in self._shards:
+            yield from list(shard)
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+    
+    def get(self, key: str, default=None):
+        return self._shard(key).get(key, default)
+    
+    def pop(self, key: str, *args):
+        return self._shard(key).pop(key, *args)
+    
+    def values(self) -> List["Alert"]:
+        return [alert for shard in self._shards for alert in list(shard.values())]
+    
+    def items(self) -> List[tuple]:
+        return [item for shard in self._shards for item in list(shard.items())]
+
+
 class AlertSimulator:
     """告警系统模拟器"""
     
@@ -127,7 +265,7 @@ class AlertSimulator:
         """
         self.config = config or self._get_default_config()
         self.alert_rules = self._load_alert_rules()
-        self.active_alerts = {}  # alert_id -> Alert
+        self.active_alerts = ShardedAlertStore()  # alert_key -> Alert
         self.alert_history = []  # 历史告警记录
         self.notification_records = []  # 通知记录
         self.running = False
@@ -137,9 +275,25 @@ class AlertSimulator:
         # 模拟数据源
         self.metric_sources = self._generate_metric_sources()
         
+        # 按 (指标类型, 服务) 预生成的采样函数
+        self._metric_samplers = {}
+        for metric_type in MetricType:
+            for source in self.metric_sources:
+                self._get_metric_sampler(metric_type, source["service"])
+        
         # 通知回调函数
         self.notification_callbacks = {}
         
+        # 通知限流：每个渠道一个令牌桶 [tokens, last_refill_ts]
+        self._rate_limit = self.config.get("notification", {}).get("rate_limit_per_minute", 10)
+        now = time.monotonic()
+        self._buckets = {channel: [float(self._rate_limit), now] for channel in NotificationChannel}
+        self._bucket_lock = threading.Lock()
+        self._rate_limited_counter = Counter()
+        
+        # 评估线程 -> 通知线程的交接队列，元素为 (alert, channel, notification_type)
+        self._notify_q = queue.SimpleQueue()
+        
     def _get_default_config(self) -> Dict:
         """获取默认配置"""
         return {
@@ -368,6 +522,9 @@ class AlertSimulator:
             thread.join(timeout=5)
         
         self.simulation_threads.clear()
+        
+        # 发送队列中剩余的通知
+        self._drain_notifications()
         self.logger.info("Alert simulation stopped")
     
     def _alert_evaluation_loop(self):
@@ -397,17 +554,34 @@ class AlertSimulator:
     
     def _notification_loop(self):
         """通知处理循环"""
+        last_check = time.monotonic()
+        
         while self.running:
             try:
-                # 处理待发送的通知
-                self._process_pending_notifications()
+                try:
+                    alert, channel, notification_type = self._notify_q.get(timeout=5)
+                    self._send_notification(alert, channel, notification_type)
+                except queue.Empty:
+                    pass
                 
-                time.sleep(5)  # 每5秒检查一次
+                # 每5秒处理一次待发送的通知
+                if time.monotonic() - last_check >= 5:
+                    self._process_pending_notifications()
+                    last_check = time.monotonic()
                 
             except Exception as e:
                 self.logger.error(f"Error in notification processing: {e}")
                 time.sleep(5)
     
+    def _drain_notifications(self):
+        """同步发送队列中所有待处理的通知"""
+        while True:
+            try:
+                alert, channel, notification_type = self._notify_q.get_nowait()
+            except queue.Empty:
+                break
+            self._send_notification(alert, channel, notification_type)
+    
     def _auto_resolve_loop(self):
         """自动解决告警循环"""
         while self.running:
@@ -426,10 +600,10 @@ class AlertSimulator:
         """评估告警规则"""
         # 模拟获取指标值
         for source in self.metric_sources:
-            metric_value = self._simulate_metric_value(rule.metric_type, source)
+            metric_value = self._metric_samplers[(rule.metric_type, source["service"])]()
             
             # 检查是否满足告警条件
-            if self._check_condition(metric_value, rule.condition, rule.threshold):
+            if rule.op(metric_value, rule.threshold):
                 # 检查是否已经有相同的告警
                 alert_key = f"{rule.id}_{source['name']}"
                 
@@ -456,6 +630,20 @@ class AlertSimulator:
     
     def _simulate_metric_value(self, metric_type: MetricType, source: Dict) -> float:
         """模拟指标值"""
+        return self._get_metric_sampler(metric_type, source["service"])()
+    
+    def _get_metric_sampler(self, metric_type: MetricType, service: str) -> Callable[[], float]:
+        """获取 (指标类型, 服务) 对应的采样函数，首次访问时生成"""
+        key = (metric_type, service)
+        sampler = self._metric_samplers.get(key)
+        if sampler is None:
+            sampler = self._build_metric_sampler(metric_type, service)
+            self._metric_samplers[key] = sampler
+        return sampler
+    
+    @staticmethod
+    def _build_metric_sampler(metric_type: MetricType, service: str) -> Callable[[], float]:
+        """生成采样函数，指标类型和服务相关的分支在此处一次性求值"""
         # 根据指标类型和数据源生成模拟值
         base_values = {
             MetricType.CPU_USAGE: 45.0,
@@ -471,51 +659,53 @@ class AlertSimulator:
         base_value = base_values.get(metric_type, 50.0)
         
         # 根据服务类型调整基础值
-        if source["service"] == "mysql" and metric_type == MetricType.CPU_USAGE:
+        if service == "mysql" and metric_type == MetricType.CPU_USAGE:
             base_value *= 1.5  # 数据库CPU使用率通常更高
-        elif source["service"] == "redis" and metric_type == MetricType.MEMORY_USAGE:
+        elif service == "redis" and metric_type == MetricType.MEMORY_USAGE:
             base_value *= 1.3  # Redis内存使用率更高
         
-        # 添加随机变化
-        variation = random.uniform(0.7, 1.4)
-        value = base_value * variation
+        # 异常值范围
+        if metric_type in [MetricType.CPU_USAGE, MetricType.MEMORY_USAGE, MetricType.DISK_USAGE]:
+            anomaly_range = (85, 98)  # 高使用率
+        elif metric_type == MetricType.RESPONSE_TIME:
+            anomaly_range = (3000, 10000)  # 高响应时间
+        elif metric_type == MetricType.ERROR_RATE:
+            anomaly_range = (8, 25)  # 高错误率
+        elif metric_type == MetricType.AVAILABILITY:
+            anomaly_range = (0.0, 0.0)  # 服务不可用
+        else:
+            anomaly_range = None
+        
+        uniform = random.uniform
+        rand = random.random
         
-        # 模拟异常情况
-        if random.random() < 0.1:  # 10%概率出现异常值
-            if metric_type in [MetricType.CPU_USAGE, MetricType.MEMORY_USAGE, MetricType.DISK_USAGE]:
-                value = random.uniform(85, 98)  # 高使用率
-            elif metric_type == MetricType.RESPONSE_TIME:
-                value = random.uniform(3000, 10000)  # 高响应时间
-            elif metric_type == MetricType.ERROR_RATE:
-                value = random.uniform(8, 25)  # 高错误率
-            elif metric_type == MetricType.AVAILABILITY:
-                value = 0.0  # 服务不可用
+        if anomaly_range is None:
+            def sample() -> float:
+                return round(base_value * uniform(0.7, 1.4), 2)
+        else:
+            low, high = anomaly_range
+            
+            def sample() -> float:
+                # 添加随机变化
+                value = base_value * uniform(0.7, 1.4)
+                # 模拟异常情况，10%概率出现异常值
+                if rand() < 0.1:
+                    value = uniform(low, high)
+                return round(value, 2)
         
-        return round(value, 2)
+        return sample
     
     def _check_condition(self, value: float, condition: str, threshold: float) -> bool:
         """检查告警条件"""
-        if condition == ">":
-            return value > threshold
-        elif condition == ">=":
-            return value >= threshold
-        elif condition == "<":
-            return value < threshold
-        elif condition == "<=":
-            return value <= threshold
-        elif condition == "==":
-            return abs(value - threshold) < 0.001
-        elif condition == "!=":
-            return abs(value - threshold) >= 0.001
-        else:
-            return False
+        return _OPS.get(condition, _never)(value, threshold)
     
     def _create_alert(self, rule: AlertRule, source: Dict, metric_value: float) -> Alert:
         """创建告警"""
         alert_id = str(uuid.uuid4())
         
         # 生成告警消息
-        message = f"{rule.name}: {source['name']} {rule.metric_type.value} is {metric_value} (threshold: {rule.threshold})"
+        metric_name = _METRIC_NAME[rule.metric_type]
+        message = f"{rule.name}: {source['name']} {metric_name} is {metric_value} (threshold: {rule.threshold})"
         
         # 生成描述
         description = f"{rule.description}. Current value: {metric_value}, Threshold: {rule.threshold}"
@@ -529,7 +719,7 @@ class AlertSimulator:
             message=message,
             description=description,
             source=source["name"],
-            metric_name=rule.metric_type.value,
+            metric_name=metric_name,
             metric_value=metric_value,
             threshold=rule.threshold,
             condition=rule.condition,
@@ -552,8 +742,7 @@ class AlertSimulator:
         
         # 从活跃告警中移除
         alert_key = f"{alert.rule_id}_{alert.source}"
-        if alert_key in self.active_alerts:
-            del self.active_alerts[alert_key]
+        self.active_alerts.pop(alert_key, None)
         
         self.logger.info(f"Alert resolved: {alert.rule_name} on {alert.source}")
         
@@ -567,7 +756,7 @@ class AlertSimulator:
             return
         
         for channel in rule.notification_channels:
-            self._send_notification(alert, channel, "alert")
+            self._notify_q.put((alert, channel, "alert"))
     
     def _schedule_resolution_notifications(self, alert: Alert):
         """安排解决通知发送"""
@@ -576,15 +765,33 @@ class AlertSimulator:
             return
         
         for channel in rule.notification_channels:
-            self._send_notification(alert, channel, "resolution")
+            self._notify_q.put((alert, channel, "resolution"))
+    
+    def _acquire_token(self, channel: NotificationChannel) -> bool:
+        """从渠道令牌桶中获取一个令牌"""
+        with self._bucket_lock:
+            bucket = self._buckets[channel]
+            now = time.monotonic()
+            bucket[0] = min(self._rate_limit, bucket[0] + (now - bucket[1]) * self._rate_limit / 60)
+            bucket[1] = now
+            
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            
+            self._rate_limited_counter[channel] += 1
+            return False
     
     def _send_notification(self, alert: Alert, channel: NotificationChannel, notification_type: str):
         """发送通知"""
+        if not self._acquire_token(channel):
+            return
+        
         notification_id = str(uuid.uuid4())
         
         # 生成通知内容
         if notification_type == "alert":
-            subject = f"🚨 {alert.severity.value.upper()}: {alert.rule_name}"
+            subject = f"🚨 {_SEV_LABEL[alert.severity]}: {alert.rule_name}"
             content = self._generate_alert_content(alert)
         else:  # resolution
             subject = f"✅ RESOLVED: {alert.rule_name}"
@@ -622,7 +829,7 @@ class AlertSimulator:
         content = f"""
 🚨 Alert: {alert.rule_name}
 
-Severity: {alert.severity.value.upper()}
+Severity: {_SEV_LABEL[alert.severity]}
 Source: {alert.source}
 Metric: {alert.metric_name}
 Current Value: {alert.metric_value}
@@ -696,9 +903,13 @@ The alert condition is no longer met.
     
     def _process_pending_notifications(self):
         """处理待发送的通知"""
-        # 这里可以实现通知重试、限流等逻辑
-        # 当前只是模拟，实际实现会更复杂
-        pass
+        # 汇总上报被限流丢弃的通知，避免逐条记录日志
+        with self._bucket_lock:
+            rate_limited = dict(self._rate_limited_counter)
+            self._rate_limited_counter.clear()
+        
+        for channel, count in rate_limited.items():
+            self.logger.warning(f"Rate limited {count} notifications via {channel.value}")
     
     def _generate_random_alerts(self):
         """生成随机告警"""
@@ -810,72 +1021,66 @@ The alert condition is no longer met.
     def get_alert_history(self, hours: int = 24) -> List[Alert]:
         """获取告警历史"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [a for a in self.alert_history if a.fired_at >= cutoff_time]
+        return self._records_since(self.alert_history, cutoff_time, _FIRED_AT)
     
     def get_notification_records(self, hours: int = 24) -> List[NotificationRecord]:
         """获取通知记录"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [n for n in self.notification_records if n.sent_at >= cutoff_time]
-    
-    def export_alerts_to_json(self, filename: str):
-        """导出告警到JSON文件"""
-        data = {
-            "active_alerts": [],
-            "alert_history": [],
-            "notification_records": [],
-            "exported_at": datetime.now().isoformat()
-        }
+        return self._records_since(self.notification_records, cutoff_time, _SENT_AT)
+    
+    @staticmethod
+    def _records_since(records: List, cutoff_time: datetime, key: Callable) -> List:
+        """二分查找时间窗口起点，records 按追加顺序即按时间有序"""
+        return records[bisect_left(records, cutoff_time, key=key):]
+    
+    def export_alerts_to_json(self, filename: str, pretty: bool = False):
+        """导出告警到JSON文件，pretty 为 True 时缩进输出"""
+        if ORJSON_AVAILABLE:
+            # orjson 原生序列化 dataclass、Enum 和 datetime，无需逐条转换
+            data = {
+                "active_alerts": list(self.active_alerts.values()),
+                "alert_history": self.alert_history,
+                "notification_records": self.notification_records,
+                "exported_at": datetime.now().isoformat()
+            }
+        else:
+            data = {
+                "active_alerts": [],
+                "alert_history": [],
+                "notification_records": [],
+                "exported_at": datetime.now().isoformat()
+            }
+            
+            # 转换活跃告警
+            for alert in self.active_alerts.values():
+                data["active_alerts"].append(self._alert_to_dict(alert))
+            
+            # 转换历史告警
+            for alert in self.alert_history:
+                data["alert_history"].append(self._alert_to_dict(alert))
+            
+            # 转换通知记录
+            for record in self.notification_records:
+                data["notification_records"].append({
+                    "id": record.id,
+                    "alert_id": record.alert_id,
+                    "channel": record.channel.value,
+                    "recipient": record.recipient,
+                    "subject": record.subject,
+                    "content": record.content,
+                    "sent_at": record.sent_at.isoformat(),
+                    "success": record.success,
+                    "error_message": record.error_message,
+                    "retry_count": record.retry_count
+                })
         
-        # 转换活跃告警
-        for alert in self.active_alerts.values():
-            data["active_alerts"].append(self._alert_to_dict(alert))
-        
-        # 转换历史告警
-        for alert in self.alert_history:
-            data["alert_history"].append(self._alert_to_dict(alert))
-        
-        # 转换通知记录
-        for record in self.notification_records:
-            data["notification_records"].append({
-                "id": record.id,
-                "alert_id": record.alert_id,
-                "channel": record.channel.value,
-                "recipient": record.recipient,
-                "subject": record.subject,
-                "content": record.content,
-                "sent_at": record.sent_at.isoformat(),
-                "success": record.success,
-                "error_message": record.error_message,
-                "retry_count": record.retry_count
-            })
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            f.write(_dumps(data, pretty))
         
         self.logger.info(f"Alerts exported to {filename}")
     
-    def _alert_to_dict(self, alert: Alert) -> Dict:
-        """将告警对象转换为字典"""
-        return {
-            "id": alert.id,
-            "rule_id": alert.rule_id,
-            "rule_name": alert.rule_name,
-            "severity": alert.severity.value,
-            "status": alert.status.value,
-            "message": alert.message,
-            "description": alert.description,
-            "source": alert.source,
-            "metric_name": alert.metric_name,
-            "metric_value": alert.metric_value,
-            "threshold": alert.threshold,
-            "condition": alert.condition,
-            "fired_at": alert.fired_at.isoformat(),
-            "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None,
-            "acknowledged_at": alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
-            "acknowledged_by": alert.acknowledged_by,
-            "tags": alert.tags,
-            "annotations": alert.annotations
-        }
+    # 由 Alert 字段生成的专用序列化函数
+    _alert_to_dict = _compile_alert_to_dict()
     
     def generate_alert_report(self) -> Dict[str, Any]:
         """生成告警报告"""
@@ -884,35 +1089,37 @@ The alert condition is no longer met.
         
         # 统计活跃告警
         active_alerts = list(self.active_alerts.values())
-        active_by_severity = {}
-        for severity in AlertSeverity:
-            active_by_severity[severity.value] = len([a for a in active_alerts if a.severity == severity])
+        severity_counts = Counter(a.severity for a in active_alerts)
+        active_by_severity = {severity.value: severity_counts[severity] for severity in AlertSeverity}
         
         # 统计24小时内的告警
-        recent_alerts = [a for a in self.alert_history if a.fired_at >= last_24h]
+        recent_alerts = self._records_since(self.alert_history, last_24h, _FIRED_AT)
         total_alerts_24h = len(recent_alerts)
         resolved_alerts_24h = len([a for a in recent_alerts if a.status == AlertStatus.RESOLVED])
         
         # 统计通知
-        recent_notifications = [n for n in self.notification_records if n.sent_at >= last_24h]
+        recent_notifications = self._records_since(self.notification_records, last_24h, _SENT_AT)
         total_notifications = len(recent_notifications)
         successful_notifications = len([n for n in recent_notifications if n.success])
         
-        # 按渠道统计通知
-        notifications_by_channel = {}
-        for channel in NotificationChannel:
-            channel_notifications = [n for n in recent_notifications if n.channel == channel]
-            notifications_by_channel[channel.value] = {
-                "total": len(channel_notifications),
-                "successful": len([n for n in channel_notifications if n.success])
+        # 按渠道统计通知，一次遍历同时累计总数和成功数
+        channel_totals = Counter()
+        channel_successes = Counter()
+        for n in recent_notifications:
+            channel_totals[n.channel] += 1
+            if n.success:
+                channel_successes[n.channel] += 1
+        
+        notifications_by_channel = {
+            channel.value: {
+                "total": channel_totals[channel],
+                "successful": channel_successes[channel]
             }
+            for channel in NotificationChannel
+        }
         
         # 最频繁的告警规则
-        rule_counts = {}
-        for alert in recent_alerts:
-            rule_counts[alert.rule_name] = rule_counts.get(alert.rule_name, 0) + 1
-        
-        top_rules = sorted(rule_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_rules = Counter(a.rule_name for a in recent_alerts).most_common(5)
         
         return {
             "summary": {
@@ -939,6 +1146,7 @@ def main():
     parser.add_argument("--duration", type=int, default=300, help="Simulation duration in seconds")
     parser.add_argument("--export", help="Export alerts to JSON file")
     parser.add_argument("--report", help="Generate alert report file")
+    parser.add_argument("--pretty", action="store_true", help="Indent exported JSON files")
     
     args = parser.parse_args()
     
@@ -946,8 +1154,8 @@ def main():
     config = None
     if args.config:
         try:
-            with open(args.config, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            with open(args.config, 'rb') as f:
+                config = _loads(f.read())
         except Exception as e:
             print(f"Failed to load config: {e}")
     
@@ -970,17 +1178,16 @@ def main():
         
         # 导出数据
         if args.export:
-            simulator.export_alerts_to_json(args.export)
+            simulator.export_alerts_to_json(args.export, args.pretty)
         
-        # 生成报告
+        # 生成报告，写文件与简要统计共用同一份
+        report = simulator.generate_alert_report()
         if args.report:
-            report = simulator.generate_alert_report()
-            with open(args.report, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            with open(args.report, 'wb') as f:
+                f.write(_dumps(report, args.pretty))
             print(f"Alert report saved to {args.report}")
         
         # 显示简要统计
-        report = simulator.generate_alert_report()
         print("\n=== Alert Simulation Summary ===")
         print(f"Active alerts: {report['summary']['active_alerts']}")
         print(f"Alerts in last 24h: {report['summary']['alerts_last_24h']}")
@@ -9,13 +9,92 @@
 import argparse
 import json
 import random
+import sys
 import time
 import uuid
+from collections import deque
+from itertools import product
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import os
 from enum import Enum
-from dataclasses import dataclass, asdict
+import numpy as np
+from dataclasses import dataclass, field, fields, is_dataclass
+
+# 可选依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba 不可用时的占位装饰器，函数按普通 NumPy 代码执行"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 模拟指标的列顺序、取值范围、工作时间放大系数和上下限
+_METRIC_KEYS = (
+    'cpu_usage', 'memory_usage', 'disk_usage', 'response_time',
+    'error_rate', 'network_errors', 'service_availability'
+)
+_METRIC_LOWS = np.array([20.0, 30.0, 40.0, 50.0, 0.0, 0.0, 0.90])
+_METRIC_HIGHS = np.array([95.0, 98.0, 96.0, 3500.0, 15.0, 800.0, 1.0])
+_BUSY_LOWS = np.array([1.2, 1.1, 1.0, 1.3, 1.5, 1.0, 1.0])
+_BUSY_HIGHS = np.array([1.5, 1.3, 1.0, 2.0, 2.5, 1.0, 1.0])
+_METRIC_FLOORS = np.array([-np.inf, -np.inf, -np.inf, -np.inf, -np.inf, -np.inf, 0.0])
+_METRIC_CAPS = np.array([100.0, 100.0, 100.0, np.inf, np.inf, np.inf, 1.0])
+
+
+@njit(cache=True)
+def _tick_kernel(uniforms, busy_uniforms, busy, rule_idx, thresholds, signs):
+    """
+    批量生成多个时间点的指标并检查告警条件
+    
+    uniforms/busy_uniforms 为 (时间点数, 指标数) 的 [0, 1) 均匀随机数，在此映射到各指标的取值范围；
+    busy 为每个时间点是否处于工作时间(1.0/0.0)；
+    rule_idx 为每条规则对应的指标列，-1 表示规则的指标不在模拟范围内。
+    """
+    metrics = _METRIC_LOWS + uniforms * (_METRIC_HIGHS - _METRIC_LOWS)
+    multipliers = _BUSY_LOWS + busy_uniforms * (_BUSY_HIGHS - _BUSY_LOWS)
+    metrics = metrics * (1.0 + busy.reshape((-1, 1)) * (multipliers - 1.0))
+    metrics = np.minimum(np.maximum(metrics, _METRIC_FLOORS), _METRIC_CAPS)
+    
+    triggered = (rule_idx >= 0) & (signs * (metrics[:, rule_idx] - thresholds) > 0)
+    return metrics, triggered
+
+
+def _json_default(obj: Any) -> Any:
+    """序列化器无法直接处理的类型：标准库 json 的 Enum/datetime/dataclass 回退，以及只读映射"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON 字节串，优先使用 orjson；默认输出紧凑格式"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
 
 class AlertSeverity(Enum):
     """告警严重程度枚举"""
@@ -64,6 +143,8 @@ class Alert:
     suppression_reason: Optional[str] = None
     tags: Dict[str, str] = None
     context: Dict[str, Any] = None
+    # 触发该告警的规则在预编译规则数组中的下标，创建时绑定，避免按 context['rule_name'] 反复查表
+    rule_idx: int = field(default=-1, repr=False, compare=False)
     
     def __post_init__(self):
         if self.tags is None:
@@ -71,23 +152,132 @@ class Alert:
         if self.context is None:
             self.context = {}
 
+# 枚举成员与列式存储中整数编码的映射
+_SEVERITIES = list(AlertSeverity)
+_STATUSES = list(AlertStatus)
+_CATEGORIES = list(AlertCategory)
+_SEV_INDEX = {s: i for i, s in enumerate(_SEVERITIES)}
+_STATUS_INDEX = {s: i for i, s in enumerate(_STATUSES)}
+_CATEGORY_INDEX = {c: i for i, c in enumerate(_CATEGORIES)}
+
+# 枚举成员到驻留字符串的映射，序列化时免去 .value 属性访问
+_SEVERITY_VALUE = {s: sys.intern(s.value) for s in AlertSeverity}
+_STATUS_VALUE = {s: sys.intern(s.value) for s in AlertStatus}
+_CATEGORY_VALUE = {c: sys.intern(c.value) for c in AlertCategory}
+
+# 模拟告警的来源和标签候选值
+_ALERT_SOURCES = tuple(f"monitoring-system-{env}" for env in ('prod', 'staging', 'dev'))
+_TAG_ENVIRONMENTS = ('production', 'staging', 'development')
+_TAG_SERVICES = ('web-app', 'api-server', 'database', 'cache')
+_TAG_REGIONS = ('us-east-1', 'us-west-2', 'eu-west-1')
+_TAG_TEAMS = ('backend', 'frontend', 'devops', 'sre')
+# 标签组合数量有限，预先构建只读映射供所有告警共享
+_TAG_POOL = tuple(
+    MappingProxyType({'environment': env, 'service': svc, 'region': region, 'team': team})
+    for env, svc, region, team in product(_TAG_ENVIRONMENTS, _TAG_SERVICES, _TAG_REGIONS, _TAG_TEAMS)
+)
+_HOST_COUNT = 100  # server-1 ~ server-100
+_INSTANCE_ID_BASE = 100000  # i-100000 ~ i-999999
+_INSTANCE_ID_COUNT = 900000
+# 一次随机抽样覆盖全部候选组合，再逐级取余拆出各项
+_ALERT_PICK_SPACE = (
+    len(_ALERT_SOURCES) * len(_TAG_POOL) * _HOST_COUNT * _INSTANCE_ID_COUNT
+)
+
+# 流式导出告警历史时内存中保留的最近记录条数
+_STREAM_HISTORY_LIMIT = 10_000
+
+class AlertColumns:
+    """
+    活跃告警的列式存储(SoA)
+    
+    每个活跃告警占一行，各字段分别存放在连续的 NumPy 数组中，
+    删除时用最后一行填补空位，保持数组紧凑。
+    """
+    
+    _DTYPES = {
+        'sev': np.int8,
+        'cat': np.int8,
+        'status': np.int8,
+        'esc': np.int8,
+        'val': np.float64,
+        'rule': np.int16
+    }
+    
+    def __init__(self, capacity: int = 64):
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in self._DTYPES.items()}
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        """返回指定列的有效部分(视图)"""
+        return self._data[name][:len(self.ids)]
+    
+    def append(self, alert_id: str, **values):
+        row = len(self.ids)
+        if row == len(self._data['val']):
+            for name, column in self._data.items():
+                self._data[name] = np.resize(column, 2 * len(column))
+        for name, value in values.items():
+            self._data[name][row] = value
+        self.ids.append(alert_id)
+        self._rows[alert_id] = row
+    
+    def remove(self, alert_id: str):
+        row = self._rows.pop(alert_id)
+        last = len(self.ids) - 1
+        if row != last:
+            for column in self._data.values():
+                column[row] = column[last]
+            moved_id = self.ids[last]
+            self.ids[row] = moved_id
+            self._rows[moved_id] = row
+        self.ids.pop()
+
 class AlertingSystem:
     """告警系统模拟器"""
     
-    def __init__(self, duration: int = 300):
+    def __init__(self, duration: int = 300, interval: float = 30, batch_size: int = 1,
+                 realtime: bool = True, history_limit: Optional[int] = None):
         """
         初始化告警系统
         
         Args:
             duration: 模拟运行时长(秒)
+            interval: 相邻两次检查的间隔(秒)
+            batch_size: 每批一次性生成的时间点数
+            realtime: True 时按墙钟时间推进并在每次检查后等待；
+                      False 时按模拟时钟推进，不等待
+            history_limit: 内存中保留的告警历史条数上限，None 表示不限
+            
+        Raises:
+            ValueError: interval 不是正数
         """
+        if interval <= 0:
+            raise ValueError(f"interval 必须为正数: {interval}")
         self.duration = duration
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.realtime = realtime
         self.start_time = datetime.now()
         self.alerts = []
         self.active_alerts = {}
-        self.alert_history = []
+        self.alert_history = deque(maxlen=history_limit)
+        self.history_total = 0
         self.running = False
         
+        # 告警历史的 JSONL 输出流，仅在流式导出时打开
+        self._history_stream = None
+        
+        # 活跃告警的列式副本，随告警进出 active_alerts 同步维护
+        self._columns = AlertColumns()
+        
+        # 指标模拟使用的随机数生成器
+        self._rng = np.random.default_rng()
+        
         # 告警规则配置
         self.alert_rules = {
             'cpu_high': {
@@ -205,39 +395,95 @@ class AlertingSystem:
                 'severity_filter': [AlertSeverity.MAJOR, AlertSeverity.CRITICAL]
             }
         }
+        
+        self._compile_rules()
+        self._compile_channels()
     
-    def generate_metrics(self) -> Dict[str, float]:
+    def _compile_channels(self):
+        """为启用的通知渠道预计算严重程度过滤位掩码"""
+        self._channel_sev_mask = {
+            channel_name: sum(1 << _SEV_INDEX[severity] for severity in set(config['severity_filter']))
+            for channel_name, config in self.notification_channels.items()
+            if config['enabled']
+        }
+    
+    def _compile_rules(self):
+        """将告警规则预编译为并行数组，供向量化条件检查使用"""
+        self._rule_names = np.array(list(self.alert_rules))
+        self._rule_index = {name: i for i, name in enumerate(self.alert_rules)}
+        self._rule_metrics = [rule['metric'] for rule in self.alert_rules.values()]
+        self._rule_thresholds = np.array(
+            [rule['threshold'] for rule in self.alert_rules.values()], dtype=np.float64
+        )
+        # 可用性指标低于阈值触发(-1)，其他指标高于阈值触发(+1)
+        self._rule_signs = np.array(
+            [-1.0 if metric == 'service_availability' else 1.0 for metric in self._rule_metrics]
+        )
+        # 恢复边界：可用性指标高于阈值+0.01，其他指标低于阈值-10%缓冲区
+        self._rule_resolve_bounds = np.array([
+            rule['threshold'] + 0.01 if rule['metric'] == 'service_availability' else rule['threshold'] * 0.9
+            for rule in self.alert_rules.values()
+        ])
+        self._rule_metric_idx = np.array(
+            [_METRIC_KEYS.index(metric) if metric in _METRIC_KEYS else -1 for metric in self._rule_metrics],
+            dtype=np.int64
+        )
+        # 升级阈值与升级后的严重程度，逐个告警按下标读取，用列表避免 NumPy 标量开销
+        self._rule_esc_thresholds = [
+            rule.get('escalation_threshold', float('inf')) for rule in self.alert_rules.values()
+        ]
+        self._rule_esc_severities = [
+            rule.get('escalation_severity') for rule in self.alert_rules.values()
+        ]
+    
+    def _simulate_tick(self, now: Optional[datetime] = None) -> Tuple[Dict[str, float], List[str]]:
         """
-        生成模拟指标数据
+        生成一个时间点的指标并检查告警条件
         
+        Args:
+            now: 当前时间，默认取 datetime.now()，同一时间点内复用
+            
         Returns:
-            指标数据字典
+            (指标数据字典, 触发的告警规则名称列表)
         """
-        # 基础指标
-        metrics = {
-            'cpu_usage': random.uniform(20, 95),
-            'memory_usage': random.uniform(30, 98),
-            'disk_usage': random.uniform(40, 96),
-            'response_time': random.uniform(50, 3500),
-            'error_rate': random.uniform(0, 15),
-            'network_errors': random.uniform(0, 800),
-            'service_availability': random.uniform(0.90, 1.0)
-        }
+        return self._simulate_ticks([now or datetime.now()])[0]
+    
+    def _simulate_ticks(self, times: List[datetime]) -> List[Tuple[Dict[str, float], List[str]]]:
+        """
+        一次生成多个时间点的指标并检查告警条件
         
-        # 添加时间相关的变化
-        hour = datetime.now().hour
-        if 9 <= hour <= 17:  # 工作时间，负载更高
-            metrics['cpu_usage'] *= random.uniform(1.2, 1.5)
-            metrics['memory_usage'] *= random.uniform(1.1, 1.3)
-            metrics['response_time'] *= random.uniform(1.3, 2.0)
-            metrics['error_rate'] *= random.uniform(1.5, 2.5)
+        Args:
+            times: 各时间点的时间
+            
+        Returns:
+            每个时间点的 (指标数据字典, 触发的告警规则名称列表)
+        """
+        metric_count = len(_METRIC_KEYS)
+        uniforms = self._rng.random((len(times), 2 * metric_count))
+        # 工作时间，负载更高
+        busy = np.array([9 <= t.hour <= 17 for t in times], dtype=np.float64)
+        values, triggered = _tick_kernel(
+            uniforms[:, :metric_count],
+            uniforms[:, metric_count:],
+            busy,
+            self._rule_metric_idx,
+            self._rule_thresholds,
+            self._rule_signs
+        )
         
-        # 确保值在合理范围内
-        metrics['cpu_usage'] = min(100, metrics['cpu_usage'])
-        metrics['memory_usage'] = min(100, metrics['memory_usage'])
-        metrics['disk_usage'] = min(100, metrics['disk_usage'])
-        metrics['service_availability'] = max(0, min(1, metrics['service_availability']))
+        return [
+            (dict(zip(_METRIC_KEYS, row)), self._rule_names[mask].tolist())
+            for row, mask in zip(values.tolist(), triggered)
+        ]
+    
+    def generate_metrics(self) -> Dict[str, float]:
+        """
+        生成模拟指标数据
         
+        Returns:
+            指标数据字典
+        """
+        metrics, _ = self._simulate_tick()
         return metrics
     
     def check_alert_conditions(self, metrics: Dict[str, float]) -> List[str]:
@@ -250,42 +496,38 @@ class AlertingSystem:
         Returns:
             触发的告警规则名称列表
         """
-        triggered_rules = []
-        
-        for rule_name, rule in self.alert_rules.items():
-            metric_name = rule['metric']
-            threshold = rule['threshold']
-            
-            if metric_name in metrics:
-                current_value = metrics[metric_name]
-                
-                # 检查是否超过阈值
-                if metric_name == 'service_availability':
-                    # 可用性指标：低于阈值触发告警
-                    if current_value < threshold:
-                        triggered_rules.append(rule_name)
-                else:
-                    # 其他指标：高于阈值触发告警
-                    if current_value > threshold:
-                        triggered_rules.append(rule_name)
+        # 缺失的指标取 NaN，比较结果恒为 False
+        values = np.fromiter(
+            (metrics.get(metric_name, np.nan) for metric_name in self._rule_metrics),
+            dtype=np.float64,
+            count=len(self._rule_metrics)
+        )
+        triggered = self._rule_signs * (values - self._rule_thresholds) > 0
         
-        return triggered_rules
+        return self._rule_names[triggered].tolist()
     
-    def create_alert(self, rule_name: str, metrics: Dict[str, float]) -> Alert:
+    def create_alert(self, rule_name: str, metrics: Dict[str, float], now: Optional[datetime] = None) -> Alert:
         """
         创建告警
         
         Args:
             rule_name: 告警规则名称
             metrics: 指标数据
+            now: 当前时间，默认取 datetime.now()，同一时间点内复用
             
         Returns:
             创建的告警对象
         """
+        now = now or datetime.now()
         rule = self.alert_rules[rule_name]
         metric_name = rule['metric']
         current_value = metrics[metric_name]
         
+        pick = random.randrange(_ALERT_PICK_SPACE)
+        pick, source = divmod(pick, len(_ALERT_SOURCES))
+        pick, tags = divmod(pick, len(_TAG_POOL))
+        instance, host = divmod(pick, _HOST_COUNT)
+        
         alert = Alert(
             id=str(uuid.uuid4()),
             title=rule['title'],
@@ -293,39 +535,36 @@ class AlertingSystem:
             severity=rule['severity'],
             status=AlertStatus.ACTIVE,
             category=rule['category'],
-            source=f"monitoring-system-{random.choice(['prod', 'staging', 'dev'])}",
+            source=_ALERT_SOURCES[source],
             metric_name=metric_name,
             current_value=current_value,
             threshold_value=rule['threshold'],
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
-            tags={
-                'environment': random.choice(['production', 'staging', 'development']),
-                'service': random.choice(['web-app', 'api-server', 'database', 'cache']),
-                'region': random.choice(['us-east-1', 'us-west-2', 'eu-west-1']),
-                'team': random.choice(['backend', 'frontend', 'devops', 'sre'])
-            },
+            created_at=now,
+            updated_at=now,
+            tags=_TAG_POOL[tags],
             context={
                 'rule_name': rule_name,
-                'detection_time': datetime.now().isoformat(),
-                'host': f"server-{random.randint(1, 100)}",
-                'instance_id': f"i-{random.randint(100000, 999999)}"
-            }
+                'detection_time': now.isoformat(),
+                'host': f"server-{host + 1}",
+                'instance_id': f"i-{_INSTANCE_ID_BASE + instance}"
+            },
+            rule_idx=self._rule_index[rule_name]
         )
         
         return alert
     
-    def should_suppress_alert(self, alert: Alert) -> Tuple[bool, Optional[str]]:
+    def should_suppress_alert(self, alert: Alert, now: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
         """
         检查是否应该抑制告警
         
         Args:
             alert: 告警对象
+            now: 当前时间，默认取 datetime.now()，同一时间点内复用
             
         Returns:
             (是否抑制, 抑制原因)
         """
-        current_time = datetime.now()
+        current_time = now or datetime.now()
         current_hour = current_time.hour
         
         for rule in self.suppression_rules:
@@ -359,16 +598,18 @@ class AlertingSystem:
         
         return False, None
     
-    def process_alert(self, alert: Alert) -> Dict[str, Any]:
+    def process_alert(self, alert: Alert, now: Optional[datetime] = None) -> Dict[str, Any]:
         """
         处理告警
         
         Args:
             alert: 告警对象
+            now: 当前时间，默认取 datetime.now()，同一时间点内复用
             
         Returns:
             处理结果字典
         """
+        now = now or datetime.now()
         result = {
             'alert_id': alert.id,
             'action': 'created',
@@ -378,7 +619,7 @@ class AlertingSystem:
         }
         
         # 检查是否应该抑制
-        should_suppress, suppression_reason = self.should_suppress_alert(alert)
+        should_suppress, suppression_reason = self.should_suppress_alert(alert, now)
         if should_suppress:
             alert.status = AlertStatus.SUPPRESSED
             alert.suppression_reason = suppression_reason
@@ -386,14 +627,12 @@ class AlertingSystem:
             result['suppression_reason'] = suppression_reason
             return result
         
-        # 检查是否需要升级
-        rule = self.alert_rules[alert.context['rule_name']]
-        if 'escalation_threshold' in rule:
-            escalation_threshold = rule['escalation_threshold']
-            if alert.current_value > escalation_threshold:
-                alert.severity = rule['escalation_severity']
-                alert.escalation_level = 1
-                result['escalated'] = True
+        # 检查是否需要升级，未配置升级的规则阈值为 inf，比较恒为假
+        rule_idx = self._alert_rule_idx(alert)
+        if alert.current_value > self._rule_esc_thresholds[rule_idx]:
+            alert.severity = self._rule_esc_severities[rule_idx]
+            alert.escalation_level = 1
+            result['escalated'] = True
         
         # 发送通知
         notifications = self.send_notifications(alert)
@@ -402,7 +641,7 @@ class AlertingSystem:
         # 模拟自动确认
         if random.random() < 0.3:  # 30%概率自动确认
             alert.status = AlertStatus.ACKNOWLEDGED
-            alert.acknowledged_at = datetime.now()
+            alert.acknowledged_at = now
             alert.acknowledged_by = random.choice(['system', 'auto-ack-bot', 'on-call-engineer'])
             result['action'] = 'acknowledged'
         
@@ -419,13 +658,11 @@ class AlertingSystem:
             发送的通知渠道列表
         """
         sent_channels = []
+        severity_bit = 1 << _SEV_INDEX[alert.severity]
         
-        for channel_name, config in self.notification_channels.items():
-            if not config['enabled']:
-                continue
-            
-            # 检查严重程度过滤
-            if alert.severity not in config['severity_filter']:
+        # 只遍历启用的渠道，严重程度过滤为一次位运算
+        for channel_name, severity_mask in self._channel_sev_mask.items():
+            if not severity_mask & severity_bit:
                 continue
             
             # 模拟发送通知
@@ -434,50 +671,65 @@ class AlertingSystem:
         
         return sent_channels
     
-    def resolve_alerts(self, metrics: Dict[str, float]) -> List[str]:
+    def _alert_rule_idx(self, alert: Alert) -> int:
+        """告警对应的规则下标，未绑定时按规则名查找"""
+        if alert.rule_idx >= 0:
+            return alert.rule_idx
+        return self._rule_index[alert.context['rule_name']]
+    
+    def _add_active_alert(self, alert: Alert):
+        """加入活跃告警并写入列式存储"""
+        self.active_alerts[alert.id] = alert
+        self._columns.append(
+            alert.id,
+            sev=_SEV_INDEX[alert.severity],
+            cat=_CATEGORY_INDEX[alert.category],
+            status=_STATUS_INDEX[alert.status],
+            esc=alert.escalation_level,
+            val=alert.current_value,
+            rule=self._alert_rule_idx(alert)
+        )
+    
+    def _remove_active_alert(self, alert_id: str) -> Alert:
+        """移出活跃告警并删除对应的列式存储行"""
+        alert = self.active_alerts.pop(alert_id)
+        self._columns.remove(alert_id)
+        return alert
+    
+    def resolve_alerts(self, metrics: Dict[str, float], now: Optional[datetime] = None) -> List[str]:
         """
         解决告警
         
         Args:
             metrics: 当前指标数据
+            now: 当前时间，默认取 datetime.now()，同一时间点内复用
             
         Returns:
             已解决的告警ID列表
         """
-        resolved_alerts = []
+        columns = self._columns
+        if not len(columns):
+            return []
         
-        for alert_id, alert in list(self.active_alerts.items()):
-            if alert.status == AlertStatus.RESOLVED:
-                continue
-            
-            rule_name = alert.context['rule_name']
-            rule = self.alert_rules[rule_name]
-            metric_name = rule['metric']
-            threshold = rule['threshold']
+        # 先按规则判断是否恢复正常，再按每个告警的规则索引展开
+        values = np.fromiter(
+            (metrics.get(metric_name, np.nan) for metric_name in self._rule_metrics),
+            dtype=np.float64,
+            count=len(self._rule_metrics)
+        )
+        rule_resolved = self._rule_signs * (values - self._rule_resolve_bounds) < 0
+        rows = np.flatnonzero(rule_resolved[columns['rule']])
+        
+        resolved_alerts = [columns.ids[row] for row in rows]
+        
+        now = now or datetime.now()
+        for alert_id in resolved_alerts:
+            # 从活跃告警中移除
+            alert = self._remove_active_alert(alert_id)
             
-            if metric_name in metrics:
-                current_value = metrics[metric_name]
-                
-                # 检查是否恢复正常
-                is_resolved = False
-                if metric_name == 'service_availability':
-                    # 可用性指标：高于阈值+缓冲区认为恢复
-                    if current_value > threshold + 0.01:
-                        is_resolved = True
-                else:
-                    # 其他指标：低于阈值-缓冲区认为恢复
-                    buffer = threshold * 0.1  # 10%缓冲区
-                    if current_value < threshold - buffer:
-                        is_resolved = True
-                
-                if is_resolved:
-                    alert.status = AlertStatus.RESOLVED
-                    alert.resolved_at = datetime.now()
-                    alert.updated_at = datetime.now()
-                    resolved_alerts.append(alert_id)
-                    
-                    # 从活跃告警中移除
-                    del self.active_alerts[alert_id]
+            alert.status = AlertStatus.RESOLVED
+            alert.resolved_at = now
+            alert.updated_at = now
         
         return resolved_alerts
     
@@ -489,25 +741,17 @@ class AlertingSystem:
             告警摘要字典
         """
         active_count = len(self.active_alerts)
-        total_count = len(self.alert_history)
-        
-        # 按严重程度统计
-        severity_stats = {}
-        for alert in self.active_alerts.values():
-            severity = alert.severity.value
-            severity_stats[severity] = severity_stats.get(severity, 0) + 1
-        
-        # 按分类统计
-        category_stats = {}
-        for alert in self.active_alerts.values():
-            category = alert.category.value
-            category_stats[category] = category_stats.get(category, 0) + 1
-        
-        # 按状态统计
-        status_stats = {}
-        for alert in self.active_alerts.values():
-            status = alert.status.value
-            status_stats[status] = status_stats.get(status, 0) + 1
+        total_count = self.history_total
+        
+        # 在列式存储上按枚举编码计数，只输出非零项
+        columns = self._columns
+        severity_counts = np.bincount(columns['sev'], minlength=len(_SEVERITIES))
+        category_counts = np.bincount(columns['cat'], minlength=len(_CATEGORIES))
+        status_counts = np.bincount(columns['status'], minlength=len(_STATUSES))
+        
+        severity_stats = {_SEVERITIES[i].value: int(n) for i, n in enumerate(severity_counts) if n}
+        category_stats = {_CATEGORIES[i].value: int(n) for i, n in enumerate(category_counts) if n}
+        status_stats = {_STATUSES[i].value: int(n) for i, n in enumerate(status_counts) if n}
         
         return {
             'active_alerts': active_count,
@@ -515,16 +759,82 @@ class AlertingSystem:
             'severity_distribution': severity_stats,
             'category_distribution': category_stats,
             'status_distribution': status_stats,
-            'suppressed_alerts': len([a for a in self.active_alerts.values() if a.status == AlertStatus.SUPPRESSED]),
-            'escalated_alerts': len([a for a in self.active_alerts.values() if a.escalation_level > 0])
+            'suppressed_alerts': int(status_counts[_STATUS_INDEX[AlertStatus.SUPPRESSED]]),
+            'escalated_alerts': int(np.count_nonzero(columns['esc']))
         }
     
-    def run_alerting(self, export_file: str = None):
+    def _process_tick(self, now: datetime, metrics: Dict[str, float], triggered_rules: List[str]):
+        """
+        处理一个时间点：创建新告警、解决恢复的告警并输出状态
+        
+        Args:
+            now: 时间点
+            metrics: 指标数据
+            triggered_rules: 触发的告警规则名称列表
+        """
+        # 创建新告警
+        new_alerts = []
+        for rule_name in triggered_rules:
+            # 检查是否已存在相同的活跃告警
+            existing_alert = None
+            for alert in self.active_alerts.values():
+                if (alert.context.get('rule_name') == rule_name and 
+                    alert.status in [AlertStatus.ACTIVE, AlertStatus.ACKNOWLEDGED]):
+                    existing_alert = alert
+                    break
+            
+            if not existing_alert:
+                alert = self.create_alert(rule_name, metrics, now)
+                result = self.process_alert(alert, now)
+                
+                self._add_active_alert(alert)
+                record = {
+                    'timestamp': now.isoformat(),
+                    'alert': self._alert_to_dict(alert),
+                    'processing_result': result
+                }
+                self.alert_history.append(record)
+                self.history_total += 1
+                if self._history_stream is not None:
+                    self._history_stream.write(_dumps(record) + b'\n')
+                new_alerts.append(alert)
+        
+        # 解决告警
+        resolved_alert_ids = self.resolve_alerts(metrics, now)
+        
+        # 显示实时信息
+        summary = self.generate_alert_summary()
+        
+        status_info = []
+        if new_alerts:
+            status_info.append(f"新增: {len(new_alerts)}")
+        if resolved_alert_ids:
+            status_info.append(f"解决: {len(resolved_alert_ids)}")
+        if summary['active_alerts'] > 0:
+            status_info.append(f"活跃: {summary['active_alerts']}")
+        
+        status_str = ", ".join(status_info) if status_info else "无变化"
+        
+        print(f"[{now.strftime('%H:%M:%S')}] {status_str}")
+        
+        # 显示新告警详情
+        for alert in new_alerts:
+            action = "抑制" if alert.status == AlertStatus.SUPPRESSED else "创建"
+            print(f"  ↳ {action}告警: {alert.title} ({alert.severity.value})")
+        
+        # 显示解决的告警
+        for alert_id in resolved_alert_ids:
+            print(f"  ↳ 解决告警: {alert_id[:8]}...")
+    
+    def run_alerting(self, export_file: str = None, pretty: bool = False, stream: bool = False):
         """
         运行告警系统模拟
         
         Args:
             export_file: 导出文件路径
+            pretty: 是否缩进输出导出文件
+            stream: 为 True 时运行期间把告警历史逐条写入 export_file (JSONL)，
+                    结束后摘要写入同名的 _summary.json 文件
         """
         print(f"🚨 启动告警系统模拟器")
         print(f"模拟时长: {self.duration}秒")
@@ -536,69 +846,39 @@ class AlertingSystem:
         self.running = True
         end_time = self.start_time + timedelta(seconds=self.duration)
         
+        interval = timedelta(seconds=self.interval)
+        sim_clock = self.start_time
+        
+        if export_file and stream:
+            self._history_stream = self._open_output(export_file)
+        
         try:
-            while datetime.now() < end_time and self.running:
-                # 生成指标数据
-                metrics = self.generate_metrics()
-                
-                # 检查告警条件
-                triggered_rules = self.check_alert_conditions(metrics)
+            while self.running:
+                # 实时模式以当前时间为起点，模拟时钟模式紧接上一批
+                batch_start = datetime.now() if self.realtime else sim_clock
+                times = [batch_start + k * interval for k in range(self.batch_size)]
+                times = [t for t in times if t < end_time]
+                if not times:
+                    break
                 
-                # 创建新告警
-                new_alerts = []
-                for rule_name in triggered_rules:
-                    # 检查是否已存在相同的活跃告警
-                    existing_alert = None
-                    for alert in self.active_alerts.values():
-                        if (alert.context.get('rule_name') == rule_name and 
-                            alert.status in [AlertStatus.ACTIVE, AlertStatus.ACKNOWLEDGED]):
-                            existing_alert = alert
-                            break
+                # 整批生成指标数据并检查告警条件，再逐个时间点处理
+                for now, (metrics, triggered_rules) in zip(times, self._simulate_ticks(times)):
+                    if not self.running:
+                        break
+                    self._process_tick(now, metrics, triggered_rules)
                     
-                    if not existing_alert:
-                        alert = self.create_alert(rule_name, metrics)
-                        result = self.process_alert(alert)
-                        
-                        self.active_alerts[alert.id] = alert
-                        self.alert_history.append({
-                            'timestamp': datetime.now().isoformat(),
-                            'alert': asdict(alert),
-                            'processing_result': result
-                        })
-                        new_alerts.append(alert)
+                    if self.realtime:
+                        time.sleep(self.interval)
                 
-                # 解决告警
-                resolved_alert_ids = self.resolve_alerts(metrics)
-                
-                # 显示实时信息
-                summary = self.generate_alert_summary()
-                
-                status_info = []
-                if new_alerts:
-                    status_info.append(f"新增: {len(new_alerts)}")
-                if resolved_alert_ids:
-                    status_info.append(f"解决: {len(resolved_alert_ids)}")
-                if summary['active_alerts'] > 0:
-                    status_info.append(f"活跃: {summary['active_alerts']}")
-                
-                status_str = ", ".join(status_info) if status_info else "无变化"
-                
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] {status_str}")
-                
-                # 显示新告警详情
-                for alert in new_alerts:
-                    action = "抑制" if alert.status == AlertStatus.SUPPRESSED else "创建"
-                    print(f"  ↳ {action}告警: {alert.title} ({alert.severity.value})")
-                
-                # 显示解决的告警
-                for alert_id in resolved_alert_ids:
-                    print(f"  ↳ 解决告警: {alert_id[:8]}...")
-                
-                time.sleep(30)  # 每30秒检查一次
+                sim_clock = times[-1] + interval
                 
         except KeyboardInterrupt:
             print("\n告警系统被用户中断")
             self.running = False
+        finally:
+            if self._history_stream is not None:
+                self._history_stream.close()
+                self._history_stream = None
         
         final_summary = self.generate_alert_summary()
         
@@ -618,63 +898,127 @@ class AlertingSystem:
         
         # 导出数据
         if export_file:
-            self.export_results(export_file)
+            if stream:
+                summary_file = os.path.splitext(export_file)[0] + '_summary.json'
+                self.export_summary(summary_file, pretty)
+                print(f"📊 告警历史已流式写入: {export_file}")
+            else:
+                self.export_results(export_file, pretty)
     
-    def export_results(self, filename: str):
+    def _alert_to_dict(self, alert: Alert) -> Dict[str, Any]:
         """
-        导出告警结果到JSON文件
+        将告警对象转换为可直接序列化的字典
         
         Args:
-            filename: 导出文件名
+            alert: 告警对象
+            
+        Returns:
+            告警字典
         """
-        export_data = {
+        return {
+            'id': alert.id,
+            'title': alert.title,
+            'description': alert.description,
+            'severity': _SEVERITY_VALUE[alert.severity],
+            'status': _STATUS_VALUE[alert.status],
+            'category': _CATEGORY_VALUE[alert.category],
+            'source': alert.source,
+            'metric_name': alert.metric_name,
+            'current_value': alert.current_value,
+            'threshold_value': alert.threshold_value,
+            'created_at': alert.created_at.isoformat(),
+            'updated_at': alert.updated_at.isoformat(),
+            'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
+            'acknowledged_at': alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
+            'acknowledged_by': alert.acknowledged_by,
+            'escalation_level': alert.escalation_level,
+            'suppression_reason': alert.suppression_reason,
+            'tags': alert.tags,
+            'context': alert.context
+        }
+    
+    @staticmethod
+    def _open_output(filename: str):
+        """创建所在目录并以二进制写方式打开导出文件"""
+        os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+        return open(filename, 'wb')
+    
+    def _export_data(self) -> Dict[str, Any]:
+        """构造不含告警历史的导出数据"""
+        return {
             'simulation_info': {
                 'type': 'alerting_system',
                 'start_time': self.start_time.isoformat(),
                 'end_time': datetime.now().isoformat(),
                 'duration': self.duration,
-                'total_alerts': len(self.alert_history)
+                'total_alerts': self.history_total
             },
             'configuration': {
-                'alert_rules': {k: {**v, 'severity': v['severity'].value, 'category': v['category'].value} 
-                               for k, v in self.alert_rules.items()},
+                'alert_rules': self.alert_rules,
                 'suppression_rules': self.suppression_rules,
                 'notification_channels': self.notification_channels
             },
             'active_alerts': {
-                alert_id: {
-                    **asdict(alert),
-                    'severity': alert.severity.value,
-                    'status': alert.status.value,
-                    'category': alert.category.value,
-                    'created_at': alert.created_at.isoformat(),
-                    'updated_at': alert.updated_at.isoformat(),
-                    'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
-                    'acknowledged_at': alert.acknowledged_at.isoformat() if alert.acknowledged_at else None
-                }
+                alert_id: self._alert_to_dict(alert)
                 for alert_id, alert in self.active_alerts.items()
             },
-            'alert_history': self.alert_history,
             'summary': self.generate_alert_summary()
         }
+    
+    def export_results(self, filename: str, pretty: bool = False):
+        """
+        导出告警结果到JSON文件
         
-        os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+        Args:
+            filename: 导出文件名
+            pretty: 是否缩进输出，默认紧凑格式
+        """
+        export_data = self._export_data()
+        export_data['alert_history'] = list(self.alert_history)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        # Enum、datetime 和 dataclass 由序列化器直接处理
+        with self._open_output(filename) as f:
+            f.write(_dumps(export_data, pretty))
         
         print(f"📊 告警系统数据已导出到: {filename}")
+    
+    def export_summary(self, filename: str, pretty: bool = False):
+        """
+        导出不含告警历史的摘要到JSON文件，配合流式导出的 JSONL 历史使用
+        
+        Args:
+            filename: 导出文件名
+            pretty: 是否缩进输出，默认紧凑格式
+        """
+        with self._open_output(filename) as f:
+            f.write(_dumps(self._export_data(), pretty))
+        
+        print(f"📊 告警摘要已导出到: {filename}")
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='告警系统模拟器')
     parser.add_argument('--duration', type=int, default=300, help='模拟时长(秒)')
     parser.add_argument('--export', type=str, help='导出文件路径')
+    parser.add_argument('--pretty', action='store_true', help='缩进输出导出的JSON文件')
+    parser.add_argument('--interval', type=float, default=30, help='检查间隔(秒)')
+    parser.add_argument('--batch-size', type=int, default=1, help='每批一次性生成的时间点数')
+    parser.add_argument('--simulated-time', action='store_true', help='按模拟时钟推进，不等待')
+    parser.add_argument('--stream', action='store_true',
+                        help='运行期间把告警历史以JSONL流式写入导出文件，内存中只保留最近的记录')
     
     args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error('--interval 必须为正数')
     
-    alerting_system = AlertingSystem(duration=args.duration)
-    alerting_system.run_alerting(export_file=args.export)
+    alerting_system = AlertingSystem(
+        duration=args.duration,
+        interval=args.interval,
+        batch_size=args.batch_size,
+        realtime=not args.simulated_time,
+        history_limit=_STREAM_HISTORY_LIMIT if args.stream else None
+    )
+    alerting_system.run_alerting(export_file=args.export, pretty=args.pretty, stream=args.stream)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -12,11 +12,136 @@ import random
 import time
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import os
 from enum import Enum
 from dataclasses import dataclass
 
+# 可选依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba 不可用时的占位装饰器，函数按普通 NumPy 代码执行"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def _json_default(obj: Any) -> Any:
+    """标准库 json 的回退序列化，与 orjson 的 OPT_SERIALIZE_NUMPY 保持一致"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any, pretty: bool = True) -> bytes:
+    """序列化为 UTF-8 JSON 字节串，优先使用 orjson；默认缩进两格，pretty=False 时输出单行"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+# 滑动窗口内样本数达到该值后才改用窗口统计量，之前沿用静态基线
+_ROLLING_MIN_SAMPLES = 5
+
+# 检测方法名称，列式存储中按下标编码：静态基线 / 滚动均值标准差 / 滚动中位数与IQR
+_DETECTION_METHODS = ('z_score', 'rolling_z_score', 'rolling_iqr')
+_METHOD_STATIC, _METHOD_ROLLING, _METHOD_IQR = range(3)
+
+# 正态分布下 IQR 约为 1.349 倍标准差，换算后与Z-score共用阈值和严重程度分档
+_IQR_TO_STD = 1.349
+
+# 工作时间负载更高的指标
+_BUSY_METRICS = ('cpu_usage', 'memory_usage', 'transaction_count')
+
+# 按小时查表的工作负载系数范围：9-17点 1.2~1.5，18-22点 1.0~1.2，其余 0.7~1.0
+_LOAD_LOWS = np.array([1.2 if 9 <= h <= 17 else 1.0 if 18 <= h <= 22 else 0.7 for h in range(24)])
+_LOAD_HIGHS = np.array([1.5 if 9 <= h <= 17 else 1.2 if 18 <= h <= 22 else 1.0 for h in range(24)])
+
+# 检测间隔为0(检测次数无法预估)时每次预生成的随机数批量(检测次数)
+_NOISE_BLOCK = 256
+
+
+@njit(cache=True)
+def _generate_kernel(means, stds, mins, maxs, load_mult, load_jitter,
+                     base_noise, load_uniforms, micro_noise):
+    """
+    由预先抽取的随机数生成一次检测的全部指标值
+    
+    Args:
+        means, stds, mins, maxs: 各指标基线
+        load_mult, load_jitter: 当前小时各指标的负载系数中值和抖动半幅；批量生成时为 (K, n) 数组
+        base_noise, micro_noise: 标准正态随机数，形状 (n,) 或批量的 (K, n)
+        load_uniforms: [0, 1) 均匀随机数，形状同上
+        
+    Returns:
+        保留两位小数的指标值数组，形状同随机数
+    """
+    factors = load_mult + load_jitter * (2.0 * load_uniforms - 1.0)
+    values = (means + stds * base_noise) * factors + stds * 0.1 * micro_noise
+    np.clip(values, mins, maxs, out=values)
+    return np.round(values, 2)
+
+
+# 注入异常的内核：各类型一个，统一签名 (原始值, 均值, 标准差, 均匀随机数, 方向, 正态随机数)，
+# 标量和数组参数均可，截断到合理范围由调用方统一完成
+@njit(cache=True)
+def _inject_spike(original, mean, std, uniform, sign, normal):
+    """尖峰异常：值突然增大"""
+    return original * (2.0 + 3.0 * uniform)
+
+
+@njit(cache=True)
+def _inject_dip(original, mean, std, uniform, sign, normal):
+    """下降异常：值突然减小"""
+    return original * (0.1 + 0.4 * uniform)
+
+
+@njit(cache=True)
+def _inject_outlier(original, mean, std, uniform, sign, normal):
+    """离群点异常：远离正常范围的值"""
+    return mean + sign * std * (4.0 + 2.0 * uniform)
+
+
+@njit(cache=True)
+def _inject_trend(original, mean, std, uniform, sign, normal):
+    """趋势异常：持续上升或下降"""
+    return original * (1.0 + sign * (0.1 + 0.2 * uniform))
+
+
+@njit(cache=True)
+def _inject_drift(original, mean, std, uniform, sign, normal):
+    """漂移异常：基线缓慢变化"""
+    return original + sign * (0.05 + 0.1 * uniform) * mean
+
+
+@njit(cache=True)
+def _inject_noise(original, mean, std, uniform, sign, normal):
+    """噪声异常"""
+    return original + normal * std * (2.0 + 2.0 * uniform)
+
+
+@njit(cache=True)
+def _zscore_kernel(values, means, stds):
+    """逐指标计算 |x - mean| / std"""
+    return np.abs((values - means) / stds)
+
+
 class AnomalyType(Enum):
     """异常类型枚举"""
     SPIKE = "spike"  # 尖峰异常
@@ -35,7 +160,19 @@ class Severity(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-@dataclass
+# 异常类型到注入内核的分派表，未单独实现的类型按噪声异常处理
+_INJECT_FNS = {
+    anomaly_type: {
+        AnomalyType.SPIKE: _inject_spike,
+        AnomalyType.DIP: _inject_dip,
+        AnomalyType.OUTLIER: _inject_outlier,
+        AnomalyType.TREND: _inject_trend,
+        AnomalyType.DRIFT: _inject_drift,
+    }.get(anomaly_type, _inject_noise)
+    for anomaly_type in AnomalyType
+}
+
+@dataclass(slots=True, frozen=True)
 class AnomalyEvent:
     """异常事件数据类"""
     timestamp: datetime
@@ -49,22 +186,120 @@ class AnomalyEvent:
     description: str
     context: Dict[str, Any]
 
+# 枚举成员与列式存储中整数编码的映射
+_ANOMALY_TYPES = list(AnomalyType)
+_SEVERITIES = list(Severity)
+_TYPE_INDEX = {t: i for i, t in enumerate(_ANOMALY_TYPES)}
+_SEVERITY_INDEX = {s: i for i, s in enumerate(_SEVERITIES)}
+
+# 按Z-score分档的严重程度：<=2.5 / (2.5, 3] / (3, 4] / >4
+_SEVERITY_BOUNDS = np.array([2.5, 3.0, 4.0])
+_SEVERITY_LEVEL_CODES = np.array([_SEVERITY_INDEX[s] for s in (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)])
+# 按偏离方向分类的异常类型：低于期望一半 / 其间 / 高于期望两倍
+_SHAPE_TYPE_CODES = np.array([_TYPE_INDEX[t] for t in (AnomalyType.DIP, AnomalyType.OUTLIER, AnomalyType.SPIKE)])
+# 未检测到异常时返回的空严重程度编码
+_NO_CODES = np.empty(0, dtype=np.intp)
+
+
+def _classify(values: np.ndarray, expected: np.ndarray, z_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    对检测到的异常批量分类
+    
+    Returns:
+        (异常类型编码, 严重程度编码)，分别对应 _ANOMALY_TYPES 和 _SEVERITIES 的下标
+    """
+    shape = np.where(values > expected * 2, 2, np.where(values < expected * 0.5, 0, 1))
+    return _SHAPE_TYPE_CODES[shape], _SEVERITY_LEVEL_CODES[np.searchsorted(_SEVERITY_BOUNDS, z_scores)]
+
+def _deviation_scores(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """
+    批量计算偏差分数 (0-100)：|实际值 - 期望值| / |期望值| 的百分比，上限 100
+    
+    分母加极小量代替 expected == 0 的分支：期望为0时实际非0得 100，实际也为0得 0。
+    """
+    return np.minimum(100.0, np.abs(actual - expected) / (np.abs(expected) + 1e-12) * 100)
+
+class ColumnStore:
+    """
+    按行追加的列式存储(SoA)
+    
+    每个字段分别存放在连续的 NumPy 数组中，容量不足时翻倍扩容。
+    """
+    
+    def __init__(self, schema: Dict[str, Tuple[Any, Tuple[int, ...]]], capacity: int = 64):
+        """
+        Args:
+            schema: 字段名 -> (dtype, 每行的形状)
+            capacity: 初始容量(行)
+        """
+        self._size = 0
+        self._data = {
+            name: np.empty((capacity,) + shape, dtype=dtype) for name, (dtype, shape) in schema.items()
+        }
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        """返回指定列的有效部分(视图)"""
+        return self._data[name][:self._size]
+    
+    def append(self, **values) -> int:
+        row = self._size
+        for name, column in self._data.items():
+            if row == len(column):
+                grown = np.empty((2 * len(column),) + column.shape[1:], dtype=column.dtype)
+                grown[:row] = column
+                self._data[name] = column = grown
+            column[row] = values[name]
+        self._size += 1
+        return row
+    
+    def extend(self, **columns) -> int:
+        """
+        批量追加多行
+        
+        Args:
+            columns: 字段名 -> 按行排列的数组，各字段行数相同
+            
+        Returns:
+            第一行的行号
+        """
+        start = self._size
+        count = len(next(iter(columns.values())))
+        for name, column in self._data.items():
+            if start + count > len(column):
+                capacity = max(2 * len(column), start + count)
+                grown = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+                grown[:start] = column[:start]
+                self._data[name] = column = grown
+            column[start:start + count] = columns[name]
+        self._size += count
+        return start
+    
+    def clear(self):
+        """清空全部行，保留已分配的容量"""
+        self._size = 0
+
 class AnomalyDetector:
     """异常检测模拟器"""
     
-    def __init__(self, duration: int = 300, detection_interval: int = 30):
+    def __init__(self, duration: int = 300, detection_interval: int = 30, window_size: int = 20,
+                 seed: Optional[int] = None, method: str = 'z_score'):
         """
         初始化异常检测器
         
         Args:
             duration: 模拟运行时长(秒)
             detection_interval: 检测间隔(秒)
+            window_size: 滚动Z-score的窗口长度(检测次数)
+            seed: 指标模拟随机数生成器的种子，None 表示随机
+            method: 检测方法，'z_score' 使用窗口均值和标准差，'iqr' 使用窗口中位数和四分位距
         """
         self.duration = duration
         self.detection_interval = detection_interval
+        self.window_size = max(2, window_size)
         self.start_time = datetime.now()
-        self.anomalies = []
-        self.metrics_history = []
         self.running = False
         
         # 基线配置
@@ -80,104 +315,301 @@ class AnomalyDetector:
         
         # 异常检测阈值
         self.thresholds = {
+            'method': method,  # 检测方法: z_score / iqr
             'z_score': 2.5,  # Z-score阈值
             'iqr_multiplier': 1.5,  # IQR倍数
             'percentage_change': 50.0,  # 百分比变化阈值
             'confidence_threshold': 0.8  # 置信度阈值
         }
+        
+        self._compile_baselines()
+        self._reset_window()
+        
+        # 指标生成所需的随机数按批预生成，用完再补充；每批不超过 _NOISE_BLOCK 次检测，长时间运行也只占固定内存
+        self._rng = np.random.default_rng(seed)
+        self._noise_block = (min(duration // detection_interval + 1, _NOISE_BLOCK)
+                             if detection_interval > 0 else _NOISE_BLOCK)
+        self._noise_pos = self._noise_block
+        
+        # 检测历史与检测到的异常按列存储，导出时再组装为字典
+        n_metrics = len(self._metric_names)
+        self.metrics_history = ColumnStore({
+            'timestamp': ('datetime64[us]', ()),
+            'values': (np.float64, (n_metrics,)),
+            'injected_type': (np.int8, ()),  # -1 表示未注入
+            'injected_metric': (np.int8, ()),
+            'injected_original': (np.float64, ()),
+            'injected_value': (np.float64, ())
+        })
+        self.anomalies = ColumnStore({
+            'tick': (np.int32, ()),
+            'type': (np.int8, ()),
+            'severity': (np.int8, ()),
+            'metric': (np.int8, ()),
+            'expected': (np.float64, ()),
+            'actual': (np.float64, ()),
+            'deviation': (np.float64, ()),
+            'confidence': (np.float64, ()),
+            'z_score': (np.float64, ()),
+            'std': (np.float64, ()),
+            'method': (np.int8, ())  # _DETECTION_METHODS 下标
+        })
+        
+        # 流式导出时记录逐次写出后清空，已写出部分只保留检测点数和异常分类计数
+        self._history_stream = None
+        self._flushed_points = 0
+        self._flushed_counts = {
+            'type': np.zeros(len(_ANOMALY_TYPES), dtype=np.int64),
+            'severity': np.zeros(len(_SEVERITIES), dtype=np.int64),
+            'metric': np.zeros(n_metrics, dtype=np.int64)
+        }
     
-    def generate_normal_metrics(self) -> Dict[str, float]:
+    def _compile_baselines(self):
+        """将基线配置预编译为按指标顺序排列的并行数组，供向量化检测使用"""
+        self._metric_names = tuple(self.baselines)
+        self._metric_index = {name: i for i, name in enumerate(self._metric_names)}
+        self._means = np.array([b['mean'] for b in self.baselines.values()], dtype=np.float64)
+        self._stds = np.array([b['std'] for b in self.baselines.values()], dtype=np.float64)
+        self._mins = np.array([b['min'] for b in self.baselines.values()], dtype=np.float64)
+        self._maxs = np.array([b['max'] for b in self.baselines.values()], dtype=np.float64)
+        
+        # 按小时查表的负载系数：工作负载相关指标取范围中值，其余为1；抖动半幅保留原有的随机范围
+        busy = np.array([name in _BUSY_METRICS for name in self._metric_names])
+        self._hour_mult = np.where(busy, ((_LOAD_LOWS + _LOAD_HIGHS) / 2)[:, None], 1.0)
+        self._hour_jitter = np.where(busy, ((_LOAD_HIGHS - _LOAD_LOWS) / 2)[:, None], 0.0)
+    
+    def _reset_window(self):
+        """清空滚动窗口：环形缓冲区及其累计和、平方和"""
+        n_metrics = len(self._metric_names)
+        self._ring = np.empty((self.window_size, n_metrics), dtype=np.float64)
+        self._sum = np.zeros(n_metrics, dtype=np.float64)
+        self._sumsq = np.zeros(n_metrics, dtype=np.float64)
+        self._count = 0
+        self._idx = 0
+    
+    def _window_stats(self) -> Tuple[np.ndarray, np.ndarray, int]:
         """
-        生成正常的指标数据
+        计算滚动窗口的中心值和尺度：Z-score 方法为均值和标准差，IQR 方法为中位数和 IQR/1.349
         
         Returns:
-            正常指标数据字典
+            (中心值数组, 尺度数组, 检测方法编码)；样本不足时返回静态基线
+        """
+        count = self._count
+        if count < _ROLLING_MIN_SAMPLES:
+            return self._means, self._stds, _METHOD_STATIC
+        
+        if self.thresholds['method'] == 'iqr':
+            # 分位数与样本顺序无关，直接对环形缓冲区的有效部分计算
+            q25, median, q75 = np.percentile(self._ring[:count], [25, 50, 75], axis=0)
+            scale = (q75 - q25) / _IQR_TO_STD
+            return median, np.where(scale > 0, scale, self._stds), _METHOD_IQR
+        
+        mean = self._sum / count
+        var = (self._sumsq - count * mean * mean) / (count - 1)
+        np.maximum(var, 0.0, out=var)
+        # 方差相对均值(或基线标准差)过小时增量公式存在相消误差，改用窗口数据两遍法重新计算
+        if np.any(var < 1e-10 * np.maximum(mean * mean, self._stds * self._stds)):
+            var = self._ring[:count].var(axis=0, ddof=1)
+        std = np.sqrt(var)
+        # 窗口内数值恒定时退回基线标准差，避免除零
+        return mean, np.where(std > 0, std, self._stds), _METHOD_ROLLING
+    
+    def _push_window(self, values: np.ndarray):
+        """将一次检测的指标值写入滚动窗口，O(1) 更新累计和与平方和"""
+        if self._count == self.window_size:
+            outgoing = self._ring[self._idx]
+            self._sum -= outgoing
+            self._sumsq -= outgoing * outgoing
+        else:
+            self._count += 1
+        self._ring[self._idx] = values
+        self._sum += values
+        self._sumsq += values * values
+        self._idx = (self._idx + 1) % self.window_size
+    
+    def _window_values(self) -> np.ndarray:
+        """按时间先后返回滚动窗口中的样本"""
+        if self._count < self.window_size:
+            return self._ring[:self._count]
+        return np.concatenate([self._ring[self._idx:], self._ring[:self._idx]])
+    
+    def _batch_window_stats(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        metrics = {}
-        current_time = datetime.now()
+        批量计算每次检测之前的滚动窗口中心值和尺度，并把窗口推进到批末
         
-        for metric_name, baseline in self.baselines.items():
-            # 基础值
-            base_value = np.random.normal(baseline['mean'], baseline['std'])
+        Args:
+            values: (K, n) 指标值，按时间先后排列
             
-            # 添加时间相关的周期性变化
-            hour = current_time.hour
-            if metric_name in ['cpu_usage', 'memory_usage', 'transaction_count']:
-                # 工作时间负载更高
-                if 9 <= hour <= 17:
-                    base_value *= random.uniform(1.2, 1.5)
-                elif 18 <= hour <= 22:
-                    base_value *= random.uniform(1.0, 1.2)
-                else:
-                    base_value *= random.uniform(0.7, 1.0)
+        Returns:
+            (中心值 (K, n), 尺度 (K, n), 检测方法编码 (K,))
+        """
+        window = self.window_size
+        prior = self._window_values()
+        
+        if self.thresholds['method'] == 'iqr':
+            means, stds, rolling = self._batch_window_quantiles(prior, values)
+            methods = np.where(rolling, _METHOD_IQR, _METHOD_STATIC).astype(np.int8)
+            for row in values[-window:]:
+                self._push_window(row)
+            return means, stds, methods
+        
+        # 接上窗口中已有的样本后，减去基线均值再做前缀和，降低相消误差
+        series = np.concatenate([prior, values]) - self._means
+        zero = np.zeros((1, series.shape[1]))
+        prefix_sum = np.concatenate([zero, np.cumsum(series, axis=0)])
+        prefix_sumsq = np.concatenate([zero, np.cumsum(series * series, axis=0)])
+        
+        ends = np.arange(len(prior), len(series))
+        counts = np.minimum(ends, window)
+        starts = ends - counts
+        rolling = counts >= _ROLLING_MIN_SAMPLES
+        
+        sums = prefix_sum[ends] - prefix_sum[starts]
+        sumsq = prefix_sumsq[ends] - prefix_sumsq[starts]
+        n = np.maximum(counts, 2)[:, None].astype(np.float64)
+        centered_mean = sums / n
+        var = (sumsq - sums * centered_mean) / (n - 1)
+        np.maximum(var, 0.0, out=var)
+        mean = centered_mean + self._means
+        
+        # 与逐次检测相同：方差过小的位置用两遍法重新计算
+        tiny = rolling[:, None] & (var < 1e-10 * np.maximum(mean * mean, self._stds * self._stds))
+        for t, i in np.argwhere(tiny):
+            var[t, i] = series[starts[t]:ends[t], i].var(ddof=1)
+        std = np.sqrt(var)
+        
+        means = np.where(rolling[:, None], mean, self._means)
+        stds = np.where(rolling[:, None] & (std > 0), std, self._stds)
+        
+        for row in values[-window:]:
+            self._push_window(row)
+        return means, stds, np.where(rolling, _METHOD_ROLLING, _METHOD_STATIC).astype(np.int8)
+    
+    def _batch_window_quantiles(self, prior: np.ndarray,
+                                values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        批量计算每次检测之前的滚动窗口中位数和 IQR/1.349
+        
+        Args:
+            prior: 窗口中已有的样本
+            values: (K, n) 指标值，按时间先后排列
             
-            # 添加随机噪声
-            noise = np.random.normal(0, baseline['std'] * 0.1)
-            value = base_value + noise
+        Returns:
+            (中位数 (K, n), 尺度 (K, n), 是否来自滚动窗口 (K,))
+        """
+        window = self.window_size
+        n_metrics = values.shape[1]
+        
+        # 前面补 NaN 后按窗口长度滑动，未填满的窗口由 nanpercentile 忽略缺位
+        series = np.concatenate([np.full((window, n_metrics), np.nan), prior, values])
+        windows = np.lib.stride_tricks.sliding_window_view(series, window, axis=0)
+        ends = np.arange(len(prior), len(prior) + len(values))
+        rolling = np.minimum(ends, window) >= _ROLLING_MIN_SAMPLES
+        
+        medians = np.tile(self._means, (len(values), 1))
+        scales = np.tile(self._stds, (len(values), 1))
+        if rolling.any():
+            q25, median, q75 = np.nanpercentile(windows[ends[rolling]], [25, 50, 75], axis=-1)
+            scale = (q75 - q25) / _IQR_TO_STD
+            medians[rolling] = median
+            scales[rolling] = np.where(scale > 0, scale, self._stds)
+        return medians, scales, rolling
+    
+    def _to_values(self, metrics: Dict[str, float]) -> np.ndarray:
+        """将指标字典按基线顺序转换为数组"""
+        return np.fromiter(
+            (metrics[name] for name in self._metric_names), dtype=np.float64, count=len(self._metric_names)
+        )
+    
+    def generate_normal_metrics(self, now: Optional[datetime] = None) -> Dict[str, float]:
+        """
+        生成正常的指标数据
+        
+        Args:
+            now: 本次检测时间，None 表示取当前时间
             
-            # 确保值在合理范围内
-            value = max(baseline['min'], min(baseline['max'], value))
-            metrics[metric_name] = round(value, 2)
+        Returns:
+            正常指标数据字典
+        """
+        return dict(zip(self._metric_names, self._generate_values(now).tolist()))
+    
+    def _generate_values(self, now: Optional[datetime] = None) -> np.ndarray:
+        """生成一次检测的正常指标值，按基线顺序排列；now 为本次检测时间，None 表示取当前时间"""
+        if self._noise_pos == self._noise_block:
+            self._refill_noise()
+        t = self._noise_pos
+        self._noise_pos += 1
+        hour = (now or datetime.now()).hour
         
-        return metrics
+        # 基础值、工作时间负载系数、随机噪声取预生成的第 t 行，数值计算交给内核
+        return _generate_kernel(
+            self._means, self._stds, self._mins, self._maxs, self._hour_mult[hour], self._hour_jitter[hour],
+            self._base_noise[t], self._load_uniforms[t], self._micro_noise[t]
+        )
+    
+    def _refill_noise(self):
+        """预生成下一批检测所需的全部随机数"""
+        shape = (self._noise_block, len(self._metric_names))
+        self._base_noise = self._rng.standard_normal(shape)
+        self._load_uniforms = self._rng.random(shape)
+        self._micro_noise = self._rng.standard_normal(shape)
+        self._noise_pos = 0
     
-    def inject_anomaly(self, metrics: Dict[str, float], anomaly_type: AnomalyType) -> Dict[str, float]:
+    def inject_anomaly(self, metrics: Dict[str, float],
+                       anomaly_type: AnomalyType) -> Tuple[Dict[str, float], str, float, float]:
         """
-        向指标数据中注入异常
+        向指标数据的副本中注入异常，原字典不变
         
         Args:
             metrics: 原始指标数据
             anomaly_type: 异常类型
             
         Returns:
-            包含异常的指标数据
+            (包含异常的指标数据, 指标名, 原始值, 异常值)
         """
         anomalous_metrics = metrics.copy()
-        metric_name = random.choice(list(metrics.keys()))
-        baseline = self.baselines[metric_name]
-        original_value = metrics[metric_name]
+        return (anomalous_metrics, *self.inject_anomaly_inplace(anomalous_metrics, anomaly_type))
+    
+    def inject_anomaly_inplace(self, metrics: Dict[str, float],
+                               anomaly_type: AnomalyType) -> Tuple[str, float, float]:
+        """
+        向指标数据中原地注入异常，只改写被选中的一个指标
         
-        if anomaly_type == AnomalyType.SPIKE:
-            # 尖峰异常：值突然增大
-            multiplier = random.uniform(2.0, 5.0)
-            anomalous_value = min(baseline['max'], original_value * multiplier)
-            
-        elif anomaly_type == AnomalyType.DIP:
-            # 下降异常：值突然减小
-            multiplier = random.uniform(0.1, 0.5)
-            anomalous_value = max(baseline['min'], original_value * multiplier)
-            
-        elif anomaly_type == AnomalyType.OUTLIER:
-            # 离群点异常：远离正常范围的值
-            if random.random() < 0.5:
-                anomalous_value = baseline['mean'] + baseline['std'] * random.uniform(4, 6)
-            else:
-                anomalous_value = baseline['mean'] - baseline['std'] * random.uniform(4, 6)
-            anomalous_value = max(baseline['min'], min(baseline['max'], anomalous_value))
-            
-        elif anomaly_type == AnomalyType.TREND:
-            # 趋势异常：持续上升或下降
-            trend_direction = random.choice([1, -1])
-            trend_magnitude = random.uniform(0.1, 0.3)
-            anomalous_value = original_value * (1 + trend_direction * trend_magnitude)
-            anomalous_value = max(baseline['min'], min(baseline['max'], anomalous_value))
+        Args:
+            metrics: 指标数据，原地修改
+            anomaly_type: 异常类型
             
-        elif anomaly_type == AnomalyType.DRIFT:
-            # 漂移异常：基线缓慢变化
-            drift_amount = random.uniform(0.05, 0.15) * baseline['mean']
-            drift_direction = random.choice([1, -1])
-            anomalous_value = original_value + drift_direction * drift_amount
-            anomalous_value = max(baseline['min'], min(baseline['max'], anomalous_value))
+        Returns:
+            (指标名, 原始值, 异常值)
+        """
+        values = self._to_values(metrics)
+        idx, original_value, anomalous_value = self._inject_values(values, anomaly_type)
+        metric_name = self._metric_names[idx]
+        metrics[metric_name] = values[idx].item()
+        return metric_name, original_value, anomalous_value
+    
+    def _inject_values(self, values: np.ndarray, anomaly_type: AnomalyType) -> Tuple[int, float, float]:
+        """
+        向指标数组中随机选一个指标原地注入异常
+        
+        Args:
+            values: 指标值(按基线顺序)，原地修改
+            anomaly_type: 异常类型
             
-        else:
-            # 默认为噪声异常
-            noise_multiplier = random.uniform(2, 4)
-            noise = np.random.normal(0, baseline['std'] * noise_multiplier)
-            anomalous_value = original_value + noise
-            anomalous_value = max(baseline['min'], min(baseline['max'], anomalous_value))
+        Returns:
+            (指标下标, 原始值, 异常值)
+        """
+        idx = random.randrange(len(values))
+        original_value = float(values[idx])
+        
+        anomalous_value = _INJECT_FNS[anomaly_type](
+            original_value, self._means[idx], self._stds[idx],
+            random.random(), random.choice((1.0, -1.0)), self._rng.standard_normal()
+        )
+        anomalous_value = float(max(self._mins[idx], min(self._maxs[idx], anomalous_value)))
         
-        anomalous_metrics[metric_name] = round(anomalous_value, 2)
-        return anomalous_metrics, metric_name, original_value, anomalous_value
+        values[idx] = round(anomalous_value, 2)
+        return idx, original_value, anomalous_value
     
     def calculate_z_score(self, value: float, metric_name: str) -> float:
         """
@@ -193,88 +625,81 @@ class AnomalyDetector:
         baseline = self.baselines[metric_name]
         return abs(value - baseline['mean']) / baseline['std']
     
-    def calculate_deviation_score(self, expected: float, actual: float) -> float:
+    def detect_anomalies(self, metrics: Dict[str, float], now: Optional[datetime] = None) -> List[AnomalyEvent]:
         """
-        计算偏差分数
+        检测指标中的异常
         
         Args:
-            expected: 期望值
-            actual: 实际值
+            metrics: 指标数据
+            now: 本次检测时间，None 表示取当前时间
             
         Returns:
-            偏差分数 (0-100)
+            检测到的异常事件列表
         """
-        if expected == 0:
-            return 100.0 if actual != 0 else 0.0
-        
-        deviation = abs(actual - expected) / expected * 100
-        return min(100.0, deviation)
+        return self._detect_values(self._to_values(metrics), now)
     
-    def detect_anomalies(self, metrics: Dict[str, float]) -> List[AnomalyEvent]:
+    def _detect_values(self, values: np.ndarray, now: Optional[datetime] = None) -> List[AnomalyEvent]:
         """
-        检测指标中的异常
+        检测指标数组中的异常
         
         Args:
-            metrics: 指标数据
+            values: 指标值(按基线顺序)
+            now: 本次检测时间，None 表示取当前时间
             
         Returns:
             检测到的异常事件列表
         """
+        # 相对最近窗口的中心值和尺度计算Z-score，只对超过阈值的指标构造事件
+        means, stds, method = self._window_stats()
+        z_scores = _zscore_kernel(values, means, stds)
+        self._push_window(values)
+        
+        mask = z_scores > self.thresholds['z_score']
+        if not mask.any():
+            # 多数检测点没有异常，直接返回
+            return []
+        hits = np.flatnonzero(mask)
+        
         anomalies = []
-        current_time = datetime.now()
+        current_time = now or datetime.now()
+        detection_method = _DETECTION_METHODS[method]
+        
+        # 确定异常类型和严重程度，计算偏差分数
+        type_codes, severity_codes = _classify(values[hits], means[hits], z_scores[hits])
+        deviation_scores = _deviation_scores(means[hits], values[hits])
         
-        for metric_name, value in metrics.items():
-            baseline = self.baselines[metric_name]
-            expected_value = baseline['mean']
+        for i, type_code, severity_code, deviation_score in zip(
+                hits.tolist(), type_codes.tolist(), severity_codes.tolist(), deviation_scores.tolist()):
+            metric_name = self._metric_names[i]
+            value = float(values[i])
+            expected_value = float(means[i])
+            z_score = float(z_scores[i])
+            anomaly_type = _ANOMALY_TYPES[type_code]
+            severity = _SEVERITIES[severity_code]
             
-            # Z-score检测
-            z_score = self.calculate_z_score(value, metric_name)
+            # 计算置信度
+            confidence = min(1.0, z_score / 5.0)
             
-            if z_score > self.thresholds['z_score']:
-                # 确定异常类型
-                if value > expected_value * 2:
-                    anomaly_type = AnomalyType.SPIKE
-                elif value < expected_value * 0.5:
-                    anomaly_type = AnomalyType.DIP
-                else:
-                    anomaly_type = AnomalyType.OUTLIER
-                
-                # 确定严重程度
-                if z_score > 4:
-                    severity = Severity.CRITICAL
-                elif z_score > 3:
-                    severity = Severity.HIGH
-                elif z_score > 2.5:
-                    severity = Severity.MEDIUM
-                else:
-                    severity = Severity.LOW
-                
-                # 计算置信度
-                confidence = min(1.0, z_score / 5.0)
-                
-                # 计算偏差分数
-                deviation_score = self.calculate_deviation_score(expected_value, value)
-                
-                # 创建异常事件
-                anomaly = AnomalyEvent(
-                    timestamp=current_time,
-                    anomaly_type=anomaly_type,
-                    severity=severity,
-                    metric_name=metric_name,
-                    expected_value=expected_value,
-                    actual_value=value,
-                    deviation_score=deviation_score,
-                    confidence=confidence,
-                    description=f"{metric_name}异常: 期望值{expected_value:.2f}, 实际值{value:.2f}, Z-score: {z_score:.2f}",
-                    context={
-                        'z_score': z_score,
-                        'baseline_mean': baseline['mean'],
-                        'baseline_std': baseline['std'],
-                        'detection_method': 'z_score'
-                    }
-                )
-                
-                anomalies.append(anomaly)
+            # 创建异常事件
+            anomaly = AnomalyEvent(
+                timestamp=current_time,
+                anomaly_type=anomaly_type,
+                severity=severity,
+                metric_name=metric_name,
+                expected_value=expected_value,
+                actual_value=value,
+                deviation_score=deviation_score,
+                confidence=confidence,
+                description=f"{metric_name}异常: 期望值{expected_value:.2f}, 实际值{value:.2f}, Z-score: {z_score:.2f}",
+                context={
+                    'z_score': z_score,
+                    'baseline_mean': expected_value,
+                    'baseline_std': float(stds[i]),
+                    'detection_method': detection_method
+                }
+            )
+            
+            anomalies.append(anomaly)
         
         return anomalies
     
@@ -374,13 +799,132 @@ class AnomalyDetector:
             'scenario_count': len(active_scenarios)
         }
     
-    def run_detection(self, export_file: str = None, inject_anomalies: bool = True):
+    def _detect_tick(self, inject_anomalies: bool):
+        """
+        执行一次检测：生成指标、按概率注入异常、检测、记录并输出状态
+        
+        Args:
+            inject_anomalies: 是否注入异常
+        """
+        # 每次检测只取一次当前时间，指标生成、记录和输出共用
+        now = datetime.now()
+        
+        # 生成指标数据
+        values = self._generate_values(now)
+        
+        # 可能注入异常
+        injected_anomaly = None
+        if inject_anomalies and random.random() < 0.2:  # 20%概率注入异常
+            anomaly_type = random.choice(_ANOMALY_TYPES)
+            injected_anomaly = (anomaly_type, *self._inject_values(values, anomaly_type))
+        
+        # 检测异常并直接写入列式存储
+        severity_codes = self._process_tick(values, injected_anomaly, now)
+        if self._history_stream is not None:
+            self._flush_history()
+        
+        # 显示实时信息
+        anomaly_count = len(severity_codes)
+        if anomaly_count > 0:
+            severity_counts = {}
+            for code in severity_codes.tolist():
+                severity = _SEVERITIES[code].value
+                severity_counts[severity] = severity_counts.get(severity, 0) + 1
+            
+            severity_str = ", ".join([f"{k}: {v}" for k, v in severity_counts.items()])
+            print(f"[{now.strftime('%H:%M:%S')}] "
+                  f"检测到 {anomaly_count} 个异常 ({severity_str})")
+            
+            if injected_anomaly:
+                print(f"  ↳ 注入异常: {injected_anomaly[0].value} in {self._metric_names[injected_anomaly[1]]}")
+        else:
+            print(f"[{now.strftime('%H:%M:%S')}] 系统正常")
+    
+    def run_detection_batch(self, inject_anomalies: bool = True):
+        """
+        按模拟时钟一次性生成并检测全部检测点，不等待
+        
+        指标生成、异常注入、Z-score 计算和异常分类都在 (检测次数 × 指标数) 的数组上完成，
+        检测结果直接写入列式存储。检测间隔为0时按每秒一次检测计。
+        
+        Args:
+            inject_anomalies: 是否注入异常
+        """
+        interval = self.detection_interval if self.detection_interval > 0 else 1
+        n_ticks = max(1, -(-self.duration // interval))
+        n_metrics = len(self._metric_names)
+        rng = self._rng
+        
+        timestamps = [self.start_time + timedelta(seconds=k * interval) for k in range(n_ticks)]
+        hours = np.array([t.hour for t in timestamps])
+        
+        # 生成全部指标数据
+        shape = (n_ticks, n_metrics)
+        values = _generate_kernel(
+            self._means, self._stds, self._mins, self._maxs, self._hour_mult[hours], self._hour_jitter[hours],
+            rng.standard_normal(shape), rng.random(shape), rng.standard_normal(shape)
+        )
+        
+        # 按20%概率选出注入异常的检测点，同类型的注入点一次调用对应内核
+        injected_type = np.full(n_ticks, -1, dtype=np.int8)
+        injected_metric = np.full(n_ticks, -1, dtype=np.int8)
+        injected_original = np.full(n_ticks, np.nan)
+        injected_value = np.full(n_ticks, np.nan)
+        if inject_anomalies:
+            rows = np.flatnonzero(rng.random(n_ticks) < 0.2)
+            injected_type[rows] = rng.integers(len(_ANOMALY_TYPES), size=len(rows))
+            injected_metric[rows] = rng.integers(n_metrics, size=len(rows))
+            uniforms = rng.random(len(rows))
+            signs = rng.choice((1.0, -1.0), size=len(rows))
+            normals = rng.standard_normal(len(rows))
+            for code, anomaly_type in enumerate(_ANOMALY_TYPES):
+                k = np.flatnonzero(injected_type[rows] == code)
+                if len(k) == 0:
+                    continue
+                t = rows[k]
+                idx = injected_metric[t]
+                original_value = values[t, idx]
+                anomalous_value = np.clip(
+                    _INJECT_FNS[anomaly_type](original_value, self._means[idx], self._stds[idx],
+                                              uniforms[k], signs[k], normals[k]),
+                    self._mins[idx], self._maxs[idx]
+                )
+                values[t, idx] = np.round(anomalous_value, 2)
+                injected_original[t] = original_value
+                injected_value[t] = anomalous_value
+        
+        # 检测全部异常
+        means, stds, methods = self._batch_window_stats(values)
+        z_scores = _zscore_kernel(values, means, stds)
+        ticks, metric_idx = np.nonzero(z_scores > self.thresholds['z_score'])
+        
+        # 写入列式存储
+        first_tick = self.metrics_history.extend(
+            timestamp=np.array(timestamps, dtype='datetime64[us]'),
+            values=values,
+            injected_type=injected_type,
+            injected_metric=injected_metric,
+            injected_original=injected_original,
+            injected_value=injected_value
+        )
+        self._append_anomalies(
+            first_tick + ticks, metric_idx, values[ticks, metric_idx], means[ticks, metric_idx],
+            z_scores[ticks, metric_idx], stds[ticks, metric_idx], methods[ticks]
+        )
+        
+        print(f"批量处理 {n_ticks} 个检测点，检测到 {len(ticks)} 个异常")
+    
+    def run_detection(self, export_file: str = None, inject_anomalies: bool = True, batch: bool = False,
+                      stream: bool = False):
         """
         运行异常检测模拟
         
         Args:
             export_file: 导出文件路径
             inject_anomalies: 是否注入异常
+            batch: 是否按模拟时钟整批处理全部检测点而不等待；检测间隔为0时总是整批处理
+            stream: 为 True 时运行期间把检测记录逐条写入 export_file (JSONL)，
+                    结束后摘要写入同名的 _summary.json 文件
         """
         print(f"🔍 启动异常检测模拟器")
         print(f"模拟时长: {self.duration}秒")
@@ -398,84 +942,35 @@ class AnomalyDetector:
         print(f"生成异常模式: {len(patterns)}个")
         print(f"激活场景: {scenarios['scenario_count']}个")
         
+        if export_file and stream:
+            self._history_stream = self._open_output(export_file)
+        
         try:
-            while datetime.now() < end_time and self.running:
-                # 生成指标数据
-                metrics = self.generate_normal_metrics()
-                
-                # 可能注入异常
-                injected_anomaly = None
-                if inject_anomalies and random.random() < 0.2:  # 20%概率注入异常
-                    anomaly_type = random.choice(list(AnomalyType))
-                    metrics, affected_metric, original_value, anomalous_value = self.inject_anomaly(metrics, anomaly_type)
-                    injected_anomaly = {
-                        'type': anomaly_type.value,
-                        'metric': affected_metric,
-                        'original_value': original_value,
-                        'anomalous_value': anomalous_value
-                    }
-                
-                # 检测异常
-                detected_anomalies = self.detect_anomalies(metrics)
-                
-                # 记录数据
-                data_point = {
-                    'timestamp': datetime.now().isoformat(),
-                    'metrics': metrics,
-                    'detected_anomalies': [
-                        {
-                            'type': anomaly.anomaly_type.value,
-                            'severity': anomaly.severity.value,
-                            'metric_name': anomaly.metric_name,
-                            'expected_value': anomaly.expected_value,
-                            'actual_value': anomaly.actual_value,
-                            'deviation_score': anomaly.deviation_score,
-                            'confidence': anomaly.confidence,
-                            'description': anomaly.description,
-                            'context': anomaly.context
-                        } for anomaly in detected_anomalies
-                    ],
-                    'injected_anomaly': injected_anomaly
-                }
-                
-                self.metrics_history.append(data_point)
-                self.anomalies.extend(detected_anomalies)
-                
-                # 显示实时信息
-                anomaly_count = len(detected_anomalies)
-                if anomaly_count > 0:
-                    severity_counts = {}
-                    for anomaly in detected_anomalies:
-                        severity = anomaly.severity.value
-                        severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                    
-                    severity_str = ", ".join([f"{k}: {v}" for k, v in severity_counts.items()])
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] "
-                          f"检测到 {anomaly_count} 个异常 ({severity_str})")
-                    
-                    if injected_anomaly:
-                        print(f"  ↳ 注入异常: {injected_anomaly['type']} in {injected_anomaly['metric']}")
-                else:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] 系统正常")
-                
-                time.sleep(self.detection_interval)
+            if batch or self.detection_interval <= 0:
+                # 按模拟时钟整批处理全部检测点，不等待
+                self.run_detection_batch(inject_anomalies)
+            else:
+                while datetime.now() < end_time and self.running:
+                    self._detect_tick(inject_anomalies)
+                    time.sleep(self.detection_interval)
                 
         except KeyboardInterrupt:
             print("\n检测被用户中断")
             self.running = False
+        finally:
+            if self._history_stream is not None:
+                self._flush_history()
+                self._history_stream.close()
+                self._history_stream = None
         
+        data_points, total_anomalies = self._totals()
         print(f"\n✅ 异常检测完成")
-        print(f"总数据点: {len(self.metrics_history)}")
-        print(f"检测到异常: {len(self.anomalies)}")
+        print(f"总数据点: {data_points}")
+        print(f"检测到异常: {total_anomalies}")
         
         # 统计异常类型
-        anomaly_stats = {}
-        severity_stats = {}
-        for anomaly in self.anomalies:
-            anomaly_type = anomaly.anomaly_type.value
-            severity = anomaly.severity.value
-            anomaly_stats[anomaly_type] = anomaly_stats.get(anomaly_type, 0) + 1
-            severity_stats[severity] = severity_stats.get(severity, 0) + 1
+        anomaly_stats = self._anomaly_counts('type', [t.value for t in _ANOMALY_TYPES])
+        severity_stats = self._anomaly_counts('severity', [s.value for s in _SEVERITIES])
         
         print("\n📊 异常统计:")
         for anomaly_type, count in anomaly_stats.items():
@@ -487,17 +982,171 @@ class AnomalyDetector:
         
         # 导出数据
         if export_file:
-            self.export_results(export_file, patterns, scenarios)
+            if stream:
+                summary_file = os.path.splitext(export_file)[0] + '_summary.json'
+                self.export_summary(summary_file, patterns, scenarios)
+                print(f"📊 检测记录已流式写入: {export_file}")
+            else:
+                self.export_results(export_file, patterns, scenarios)
     
-    def export_results(self, filename: str, patterns: List[Dict], scenarios: Dict):
+    def _process_tick(self, values: np.ndarray,
+                      injected_anomaly: Optional[Tuple[AnomalyType, int, float, float]],
+                      now: datetime) -> np.ndarray:
         """
-        导出检测结果到JSON文件
+        对一次检测的指标值计算Z-score并分类，指标、注入信息和检测结果直接写入列式存储
         
         Args:
-            filename: 导出文件名
-            patterns: 异常模式
-            scenarios: 场景信息
+            values: 指标值(按基线顺序)
+            injected_anomaly: (异常类型, 指标下标, 原始值, 异常值)，未注入时为 None
+            now: 本次检测时间
+            
+        Returns:
+            检测到的各异常的严重程度编码
+        """
+        means, stds, method = self._window_stats()
+        z_scores = _zscore_kernel(values, means, stds)
+        self._push_window(values)
+        mask = z_scores > self.thresholds['z_score']
+        
+        if injected_anomaly:
+            anomaly_type, metric_idx, original_value, anomalous_value = injected_anomaly
+            injected = (_TYPE_INDEX[anomaly_type], metric_idx, original_value, anomalous_value)
+        else:
+            injected = (-1, -1, np.nan, np.nan)
+        
+        tick = self.metrics_history.append(
+            timestamp=np.datetime64(now, 'us'),
+            values=values,
+            injected_type=injected[0],
+            injected_metric=injected[1],
+            injected_original=injected[2],
+            injected_value=injected[3]
+        )
+        
+        if not mask.any():
+            # 多数检测点没有异常，跳过分类和写入
+            return _NO_CODES
+        hits = np.flatnonzero(mask)
+        return self._append_anomalies(
+            np.full(len(hits), tick), hits, values[hits], means[hits],
+            z_scores[hits], stds[hits], np.full(len(hits), method)
+        )
+    
+    def _append_anomalies(self, ticks: np.ndarray, metric_idx: np.ndarray, actual: np.ndarray,
+                          expected: np.ndarray, z_scores: np.ndarray, stds: np.ndarray,
+                          methods: np.ndarray) -> np.ndarray:
+        """
+        对检测到的异常分类、计算偏差分数和置信度，批量写入异常列式存储
+        
+        Args:
+            ticks: 所属检测点行号
+            metric_idx: 指标下标
+            actual, expected: 实际值与期望值
+            z_scores, stds: Z-score 及所用标准差
+            methods: 检测方法编码
+            
+        Returns:
+            各异常的严重程度编码
+        """
+        anomaly_types, severities = _classify(actual, expected, z_scores)
+        self.anomalies.extend(
+            tick=ticks,
+            type=anomaly_types,
+            severity=severities,
+            metric=metric_idx,
+            expected=expected,
+            actual=actual,
+            deviation=_deviation_scores(expected, actual),
+            confidence=np.minimum(1.0, z_scores / 5.0),
+            z_score=z_scores,
+            std=stds,
+            method=methods
+        )
+        return severities
+    
+    def _anomaly_counts(self, column: str, labels: List[str]) -> Dict[str, int]:
+        """按异常存储中某一编码列计数(含已流式写出的部分)，只输出非零项"""
+        counts = self._flushed_counts[column] + np.bincount(self.anomalies[column], minlength=len(labels))
+        return {labels[i]: int(n) for i, n in enumerate(counts) if n}
+    
+    def _totals(self) -> Tuple[int, int]:
+        """(总检测点数, 总异常数)，含已流式写出的部分"""
+        return (self._flushed_points + len(self.metrics_history),
+                int(self._flushed_counts['type'].sum()) + len(self.anomalies))
+    
+    def _flush_history(self):
+        """把存储中的检测记录逐行写入流式导出文件，计入累计统计后清空存储"""
+        for record in self._history_records():
+            self._history_stream.write(_dumps(record, pretty=False) + b'\n')
+        self._flushed_points += len(self.metrics_history)
+        for column, counts in self._flushed_counts.items():
+            counts += np.bincount(self.anomalies[column], minlength=len(counts))
+        self.metrics_history.clear()
+        self.anomalies.clear()
+    
+    def _history_records(self) -> List[Dict[str, Any]]:
         """
+        由列式历史组装导出用的检测记录
+        
+        Returns:
+            每次检测一条记录的列表
+        """
+        names = self._metric_names
+        anomalies = self.anomalies
+        
+        detected = []
+        columns = ('type', 'severity', 'metric', 'expected', 'actual', 'deviation', 'confidence', 'z_score', 'std', 'method')
+        for type_code, severity_code, metric, expected, actual, deviation, confidence, z_score, std, method in zip(
+                *(anomalies[name].tolist() for name in columns)):
+            metric_name = names[metric]
+            detected.append({
+                'type': _ANOMALY_TYPES[type_code].value,
+                'severity': _SEVERITIES[severity_code].value,
+                'metric_name': metric_name,
+                'expected_value': expected,
+                'actual_value': actual,
+                'deviation_score': deviation,
+                'confidence': confidence,
+                'description': f"{metric_name}异常: 期望值{expected:.2f}, 实际值{actual:.2f}, Z-score: {z_score:.2f}",
+                'context': {
+                    'z_score': z_score,
+                    'baseline_mean': expected,
+                    'baseline_std': std,
+                    'detection_method': _DETECTION_METHODS[method]
+                }
+            })
+        
+        # 异常按检测顺序追加，按检测序号切分即可得到每次检测的异常列表
+        history = self.metrics_history
+        bounds = np.searchsorted(anomalies['tick'], np.arange(len(history) + 1)).tolist()
+        
+        records = []
+        columns = ('timestamp', 'values', 'injected_type', 'injected_metric', 'injected_original', 'injected_value')
+        for tick, (timestamp, values, injected_type, injected_metric, injected_original, injected_value) in enumerate(
+                zip(*(history[name].tolist() for name in columns))):
+            records.append({
+                'timestamp': timestamp.isoformat(),
+                'metrics': dict(zip(names, values)),
+                'detected_anomalies': detected[bounds[tick]:bounds[tick + 1]],
+                'injected_anomaly': None if injected_type < 0 else {
+                    'type': _ANOMALY_TYPES[injected_type].value,
+                    'metric': names[injected_metric],
+                    'original_value': injected_original,
+                    'anomalous_value': injected_value
+                }
+            })
+        return records
+    
+    @staticmethod
+    def _open_output(filename: str):
+        """创建所在目录并以二进制写方式打开导出文件"""
+        os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+        return open(filename, 'wb')
+    
+    def _export_data(self, patterns: List[Dict], scenarios: Dict,
+                     metrics_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """构造导出数据，metrics_history 为 None 时不含检测历史"""
+        data_points, total_anomalies = self._totals()
         export_data = {
             'simulation_info': {
                 'type': 'anomaly_detection',
@@ -505,42 +1154,54 @@ class AnomalyDetector:
                 'end_time': datetime.now().isoformat(),
                 'duration': self.duration,
                 'detection_interval': self.detection_interval,
-                'data_points': len(self.metrics_history),
-                'total_anomalies': len(self.anomalies)
+                'data_points': data_points,
+                'total_anomalies': total_anomalies
             },
             'configuration': {
                 'baselines': self.baselines,
                 'thresholds': self.thresholds
             },
             'patterns': patterns,
-            'scenarios': scenarios,
-            'metrics_history': self.metrics_history,
-            'summary': {
-                'anomaly_types': {},
-                'severity_distribution': {},
-                'affected_metrics': {}
-            }
+            'scenarios': scenarios
         }
+        if metrics_history is not None:
+            export_data['metrics_history'] = metrics_history
+        export_data['summary'] = {
+            'anomaly_types': self._anomaly_counts('type', [t.value for t in _ANOMALY_TYPES]),
+            'severity_distribution': self._anomaly_counts('severity', [s.value for s in _SEVERITIES]),
+            'affected_metrics': self._anomaly_counts('metric', self._metric_names)
+        }
+        return export_data
+    
+    def export_results(self, filename: str, patterns: List[Dict], scenarios: Dict):
+        """
+        导出检测结果到JSON文件
         
-        # 生成汇总统计
-        for anomaly in self.anomalies:
-            anomaly_type = anomaly.anomaly_type.value
-            severity = anomaly.severity.value
-            metric_name = anomaly.metric_name
-            
-            export_data['summary']['anomaly_types'][anomaly_type] = \
-                export_data['summary']['anomaly_types'].get(anomaly_type, 0) + 1
-            export_data['summary']['severity_distribution'][severity] = \
-                export_data['summary']['severity_distribution'].get(severity, 0) + 1
-            export_data['summary']['affected_metrics'][metric_name] = \
-                export_data['summary']['affected_metrics'].get(metric_name, 0) + 1
-        
-        os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+        Args:
+            filename: 导出文件名
+            patterns: 异常模式
+            scenarios: 场景信息
+        """
+        export_data = self._export_data(patterns, scenarios, self._history_records())
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        with self._open_output(filename) as f:
+            f.write(_dumps(export_data))
         
         print(f"📊 异常检测结果已导出到: {filename}")
+    
+    def export_summary(self, filename: str, patterns: List[Dict], scenarios: Dict):
+        """
+        导出不含检测历史的摘要到JSON文件，配合流式导出的 JSONL 记录使用
+        
+        Args:
+            filename: 导出文件名
+            patterns: 异常模式
+            scenarios: 场景信息
+        """
+        with self._open_output(filename) as f:
+            f.write(_dumps(self._export_data(patterns, scenarios)))
+        
+        print(f"📊 异常检测摘要已导出到: {filename}")
 
 def main():
     """主函数"""
@@ -549,11 +1210,20 @@ def main():
     parser.add_argument('--interval', type=int, default=30, help='检测间隔(秒)')
     parser.add_argument('--export', type=str, help='导出文件路径')
     parser.add_argument('--no-inject', action='store_true', help='禁用异常注入')
+    parser.add_argument('--window', type=int, default=20, help='滚动Z-score窗口长度(检测次数)')
+    parser.add_argument('--seed', type=int, help='指标模拟的随机种子')
+    parser.add_argument('--method', choices=['z_score', 'iqr'], default='z_score',
+                        help='检测方法: z_score(窗口均值/标准差) 或 iqr(窗口中位数/四分位距)')
+    parser.add_argument('--batch', action='store_true', help='按模拟时钟整批处理全部检测点，不等待')
+    parser.add_argument('--stream', action='store_true',
+                        help='运行期间把检测记录以JSONL流式写入导出文件，内存中不保留历史')
     
     args = parser.parse_args()
     
-    detector = AnomalyDetector(duration=args.duration, detection_interval=args.interval)
-    detector.run_detection(export_file=args.export, inject_anomalies=not args.no_inject)
+    detector = AnomalyDetector(duration=args.duration, detection_interval=args.interval,
+                               window_size=args.window, seed=args.seed, method=args.method)
+    detector.run_detection(export_file=args.export, inject_anomalies=not args.no_inject, batch=args.batch,
+                           stream=args.stream)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
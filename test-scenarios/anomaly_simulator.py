@@ -14,11 +14,58 @@ import json
 import random
 import time
 import math
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, FrozenSet, Callable
+from functools import partial
+from dataclasses import dataclass, field
 from enum import Enum
 
+# 可选依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba 不可用时的占位装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def _json_default(obj: Any) -> Any:
+    """标准库 json 的回退序列化，与 orjson 的 OPT_SERIALIZE_NUMPY 保持一致"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """序列化为缩进两格的 UTF-8 JSON 字节串，优先使用 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+# 周期性异常的周期（秒）
+_PERIODIC_CYCLE_SECONDS = 30 * 60
+
+# 倍数曲线编码：线性增长 / 正弦周期 / 指数趋近 / 阶梯 / 钟形
+_MULT_LINEAR, _MULT_PERIODIC, _MULT_EXP, _MULT_STEP, _MULT_BELL = range(5)
+
+# 倍数查找表的大小：按进度 [0, 1] 均分；周期性异常按周期内相位均分
+_LUT_SIZE = 1024
+_SINE_LUT_SIZE = 2048
+
 
 class AnomalyType(Enum):
     """异常类型枚举"""
@@ -34,27 +81,197 @@ class AnomalyType(Enum):
     GRADUAL_DEGRADATION = "gradual_degradation"        # 渐进式性能下降
 
 
-@dataclass
+# 异常类型到倍数曲线编码的映射，未列出的类型使用钟形曲线
+_MULT_KINDS = {
+    AnomalyType.MEMORY_LEAK: _MULT_LINEAR,
+    AnomalyType.PERIODIC_ANOMALY: _MULT_PERIODIC,
+    AnomalyType.GRADUAL_DEGRADATION: _MULT_EXP,
+    AnomalyType.CASCADING_FAILURE: _MULT_STEP,
+}
+
+# 各异常类型的描述模板，读取 description 时才格式化
+# {duration}: 持续时间（分钟）；{severity}: 严重程度倍数；{detail}: 创建时附带的补充信息
+_DESCRIPTION_TEMPLATES = {
+    AnomalyType.PERFORMANCE_DEGRADATION: "Performance degradation lasting {duration} minutes with {severity}x impact",
+    AnomalyType.ERROR_SPIKE: "Error rate spike with {severity}x normal error rate for {duration} minutes",
+    AnomalyType.RESOURCE_EXHAUSTION: "{detail} exhaustion for {duration} minutes",
+    AnomalyType.MEMORY_LEAK: "Memory leak causing gradual memory increase over {duration} minutes",
+    AnomalyType.DATABASE_SLOWDOWN: "Database slowdown with {severity}x query time for {duration} minutes",
+    AnomalyType.CASCADING_FAILURE: "Cascading failure affecting multiple systems for {duration} minutes",
+    AnomalyType.PERIODIC_ANOMALY: "Periodic anomaly with {detail}-minute cycles over {duration} minutes",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class AnomalyPattern:
-    """异常模式定义"""
+    """异常模式定义，创建后不可修改（需要调整时用 dataclasses.replace 生成新模式）"""
     anomaly_type: AnomalyType
     start_time: datetime
     duration_minutes: int
     severity_multiplier: float
-    affected_metrics: List[str]
-    description: str
+    affected_metrics: FrozenSet[str]
     recovery_time_minutes: int = 5
+    # 描述模板中 {detail} 的取值，如资源类型、周期长度
+    description_detail: Any = None
+    # 按需构建并缓存的倍数查找表；由不可修改的类型、时长和严重程度决定，构建后不会失效
+    _multiplier_lut: Optional[List[float]] = field(default=None, init=False, repr=False, compare=False)
+    # 构造时预计算的起止时间(Unix 时间戳及 ISO 字符串)与总时长(秒)
+    _start_epoch: float = field(init=False, repr=False, compare=False)
+    _end_epoch: float = field(init=False, repr=False, compare=False)
+    _total_duration: float = field(init=False, repr=False, compare=False)
+    _start_iso: str = field(init=False, repr=False, compare=False)
+    _end_iso: str = field(init=False, repr=False, compare=False)
+    # 倍数曲线编码(_MULT_*)，作为倍数函数表的下标
+    _mult_kind: int = field(init=False, repr=False, compare=False)
+    # 绑定了严重程度的单点倍数函数，调用方式为 fn(progress, elapsed)；严重程度不可修改，绑定值始终有效
+    _multiplier_fn: Callable[[float, float], float] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # 模式不可修改，预计算的字段不会与公开字段不一致
+        mult_kind = _MULT_KINDS.get(self.anomaly_type, _MULT_BELL)
+        start_epoch = self.start_time.timestamp()
+        total_duration = self.duration_minutes * 60.0
+        object.__setattr__(self, "_mult_kind", mult_kind)
+        object.__setattr__(self, "_multiplier_fn", partial(_MULTIPLIER_FNS[mult_kind], self.severity_multiplier))
+        object.__setattr__(self, "_start_epoch", start_epoch)
+        object.__setattr__(self, "_total_duration", total_duration)
+        object.__setattr__(self, "_end_epoch", start_epoch + total_duration)
+        object.__setattr__(self, "_start_iso", self.start_time.isoformat())
+        object.__setattr__(self, "_end_iso", (self.start_time + timedelta(minutes=self.duration_minutes)).isoformat())
+    
+    @property
+    def description(self) -> str:
+        """异常描述，按类型模板在读取时格式化"""
+        template = _DESCRIPTION_TEMPLATES.get(self.anomaly_type)
+        if template is None:
+            return f"{self.anomaly_type.value} lasting {self.duration_minutes} minutes"
+        return template.format(duration=self.duration_minutes,
+                               severity=self.severity_multiplier,
+                               detail=self.description_detail)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _multiplier_kernel(elapsed, total_duration, severity, kind, out):
+    """
+    按倍数曲线逐点计算倍数，写入 out
+    
+    Args:
+        elapsed: 距异常开始的秒数
+        total_duration: 异常总时长（秒）
+        severity: 严重程度倍数
+        kind: 倍数曲线编码(_MULT_*)
+        out: 输出数组，与 elapsed 等长
+    """
+    for i in prange(elapsed.shape[0]):
+        progress = elapsed[i] / total_duration
+        if kind == _MULT_LINEAR:
+            multiplier = 1.0 + (severity - 1.0) * progress
+        elif kind == _MULT_PERIODIC:
+            multiplier = 1.0 + (severity - 1.0) * max(0.0, np.sin(2 * np.pi * elapsed[i] / _PERIODIC_CYCLE_SECONDS))
+        elif kind == _MULT_EXP:
+            multiplier = 1.0 + (severity - 1.0) * (1 - np.exp(-3 * progress))
+        elif kind == _MULT_STEP:
+            if progress < 0.2:
+                multiplier = 1.5
+            elif progress < 0.4:
+                multiplier = 2.0
+            elif progress < 0.7:
+                multiplier = 3.0
+            else:
+                multiplier = severity
+        else:
+            multiplier = 1.0 + (severity - 1.0) * np.exp(-((progress - 0.5) * 4) ** 2)
+        out[i] = multiplier
+
+
+def _multiplier_array(pattern: AnomalyPattern, elapsed: np.ndarray) -> np.ndarray:
+    """
+    按异常类型批量计算倍数，numba 可用时交给编译内核
+    
+    Args:
+        pattern: 异常模式
+        elapsed: 距异常开始的秒数
+        
+    Returns:
+        倍数数组
+    """
+    total_duration = pattern._total_duration
+    severity = pattern.severity_multiplier
+    if NUMBA_AVAILABLE:
+        elapsed = np.ascontiguousarray(elapsed, dtype=np.float64)
+        out = np.empty_like(elapsed)
+        _multiplier_kernel(elapsed, total_duration, float(severity), pattern._mult_kind, out)
+        return out
+    
+    kind = pattern._mult_kind
+    progress = elapsed / total_duration
+    if kind == _MULT_LINEAR:
+        return 1.0 + (severity - 1.0) * progress
+    if kind == _MULT_PERIODIC:
+        return 1.0 + (severity - 1.0) * np.maximum(0, np.sin(2 * np.pi * elapsed / _PERIODIC_CYCLE_SECONDS))
+    if kind == _MULT_EXP:
+        return 1.0 + (severity - 1.0) * (1 - np.exp(-3 * progress))
+    if kind == _MULT_STEP:
+        return np.select([progress < 0.2, progress < 0.4, progress < 0.7], [1.5, 2.0, 3.0], default=severity)
+    return 1.0 + (severity - 1.0) * np.exp(-((progress - 0.5) * 4) ** 2)
+
+
+def _leak_multiplier(severity: float, progress: float, elapsed: float) -> float:
+    """内存泄漏：线性增长"""
+    return 1.0 + (severity - 1.0) * progress
+
+
+def _periodic_multiplier(severity: float, progress: float, elapsed: float,
+                         _sin=math.sin, _two_pi=2 * math.pi, _cycle=_PERIODIC_CYCLE_SECONDS) -> float:
+    """周期性异常：正弦波模式（math 函数与常量绑定为默认参数，免去每次调用的全局查找）"""
+    wave = _sin(_two_pi * elapsed / _cycle)
+    return 1.0 + (severity - 1.0) * wave if wave > 0 else 1.0
+
+
+def _gradual_multiplier(severity: float, progress: float, elapsed: float, _exp=math.exp) -> float:
+    """渐进式下降：指数增长"""
+    return 1.0 + (severity - 1.0) * (1 - _exp(-3 * progress))
+
+
+def _cascading_multiplier(severity: float, progress: float, elapsed: float) -> float:
+    """级联故障：阶梯式增长"""
+    if progress < 0.2:
+        return 1.5
+    if progress < 0.4:
+        return 2.0
+    if progress < 0.7:
+        return 3.0
+    return severity
+
+
+def _bell_multiplier(severity: float, progress: float, elapsed: float, _exp=math.exp) -> float:
+    """其他异常类型：钟形曲线，在异常中期达到峰值，开始和结束时影响较小"""
+    return 1.0 + (severity - 1.0) * _exp(-((progress - 0.5) * 4) ** 2)
+
+
+# 按倍数曲线编码(_MULT_*)索引的单点倍数函数表
+_MULTIPLIER_FNS = (
+    _leak_multiplier,
+    _periodic_multiplier,
+    _gradual_multiplier,
+    _cascading_multiplier,
+    _bell_multiplier,
+)
 
 
 class AnomalySimulator:
     """异常场景模拟器"""
     
-    def __init__(self):
+    def __init__(self, use_lut: bool = False):
         """
         初始化异常模拟器
+        
+        Args:
+            use_lut: apply_anomaly_to_value 是否按进度查表取倍数（结果按表格精度近似）
         """
         self.anomaly_patterns = []
         self.current_anomalies = []
+        self.use_lut = use_lut
         
     def create_performance_degradation_pattern(self, 
                                              start_time: datetime,
@@ -76,12 +293,11 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=severity,
-            affected_metrics=[
+            affected_metrics=frozenset([
                 "http_request_duration_ms",
                 "db_query_duration_ms",
                 "http_requests_per_second"
-            ],
-            description=f"Performance degradation lasting {duration_minutes} minutes with {severity}x impact",
+            ]),
             recovery_time_minutes=10
         )
     
@@ -105,12 +321,11 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=error_multiplier,
-            affected_metrics=[
+            affected_metrics=frozenset([
                 "http_error_rate",
                 "http_requests_per_second",
                 "http_request_duration_ms"
-            ],
-            description=f"Error rate spike with {error_multiplier}x normal error rate for {duration_minutes} minutes",
+            ]),
             recovery_time_minutes=5
         )
     
@@ -130,13 +345,13 @@ class AnomalySimulator:
             异常模式对象
         """
         if resource_type == "memory":
-            affected_metrics = ["system_memory_usage_percent"]
+            affected_metrics = frozenset(["system_memory_usage_percent"])
             severity = 1.5
         elif resource_type == "cpu":
-            affected_metrics = ["system_cpu_usage_percent"]
+            affected_metrics = frozenset(["system_cpu_usage_percent"])
             severity = 2.5
         elif resource_type == "disk":
-            affected_metrics = ["system_disk_io_mbps"]
+            affected_metrics = frozenset(["system_disk_io_mbps"])
             severity = 5.0
         else:
             raise ValueError(f"Unknown resource type: {resource_type}")
@@ -147,7 +362,7 @@ class AnomalySimulator:
             duration_minutes=duration_minutes,
             severity_multiplier=severity,
             affected_metrics=affected_metrics,
-            description=f"{resource_type.title()} exhaustion for {duration_minutes} minutes",
+            description_detail=resource_type.title(),
             recovery_time_minutes=15
         )
     
@@ -169,8 +384,7 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=1.8,
-            affected_metrics=["system_memory_usage_percent"],
-            description=f"Memory leak causing gradual memory increase over {duration_minutes} minutes",
+            affected_metrics=frozenset(["system_memory_usage_percent"]),
             recovery_time_minutes=20
         )
     
@@ -194,12 +408,11 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=slowdown_factor,
-            affected_metrics=[
+            affected_metrics=frozenset([
                 "db_query_duration_ms",
                 "db_active_connections",
                 "db_lock_wait_time_ms"
-            ],
-            description=f"Database slowdown with {slowdown_factor}x query time for {duration_minutes} minutes",
+            ]),
             recovery_time_minutes=8
         )
     
@@ -221,14 +434,13 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=4.0,
-            affected_metrics=[
+            affected_metrics=frozenset([
                 "http_request_duration_ms",
                 "http_error_rate",
                 "db_query_duration_ms",
                 "system_cpu_usage_percent",
                 "system_memory_usage_percent"
-            ],
-            description=f"Cascading failure affecting multiple systems for {duration_minutes} minutes",
+            ]),
             recovery_time_minutes=25
         )
     
@@ -252,18 +464,18 @@ class AnomalySimulator:
             start_time=start_time,
             duration_minutes=duration_minutes,
             severity_multiplier=2.5,
-            affected_metrics=[
+            affected_metrics=frozenset([
                 "http_request_duration_ms",
                 "system_cpu_usage_percent"
-            ],
-            description=f"Periodic anomaly with {cycle_minutes}-minute cycles over {duration_minutes} minutes",
+            ]),
+            description_detail=cycle_minutes,
             recovery_time_minutes=5
         )
     
     def apply_anomaly_to_value(self, 
                               base_value: float,
                               metric_name: str,
-                              timestamp: datetime,
+                              timestamp: Any,
                               pattern: AnomalyPattern) -> float:
         """
         将异常模式应用到指标值上
@@ -271,7 +483,7 @@ class AnomalySimulator:
         Args:
             base_value: 基础值
             metric_name: 指标名称
-            timestamp: 时间戳
+            timestamp: 时间戳，datetime 或 datetime.timestamp() 得到的秒数
             pattern: 异常模式
             
         Returns:
@@ -281,50 +493,24 @@ class AnomalySimulator:
             return base_value
         
         # 检查是否在异常时间范围内
-        anomaly_end = pattern.start_time + timedelta(minutes=pattern.duration_minutes)
-        if not (pattern.start_time <= timestamp <= anomaly_end):
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        if not (pattern._start_epoch <= timestamp <= pattern._end_epoch):
             return base_value
         
         # 计算异常进度（0-1）
-        elapsed = (timestamp - pattern.start_time).total_seconds()
-        total_duration = pattern.duration_minutes * 60
-        progress = elapsed / total_duration
+        elapsed = timestamp - pattern._start_epoch
+        progress = elapsed / pattern._total_duration
         
         # 根据异常类型应用不同的变化模式
-        if pattern.anomaly_type == AnomalyType.MEMORY_LEAK:
-            # 内存泄漏：线性增长
-            multiplier = 1.0 + (pattern.severity_multiplier - 1.0) * progress
-        
-        elif pattern.anomaly_type == AnomalyType.PERIODIC_ANOMALY:
-            # 周期性异常：正弦波模式
-            cycle_seconds = 30 * 60  # 30分钟周期
-            sine_value = math.sin(2 * math.pi * elapsed / cycle_seconds)
-            multiplier = 1.0 + (pattern.severity_multiplier - 1.0) * max(0, sine_value)
-        
-        elif pattern.anomaly_type == AnomalyType.GRADUAL_DEGRADATION:
-            # 渐进式下降：指数增长
-            multiplier = 1.0 + (pattern.severity_multiplier - 1.0) * (1 - math.exp(-3 * progress))
-        
-        elif pattern.anomaly_type == AnomalyType.CASCADING_FAILURE:
-            # 级联故障：阶梯式增长
-            if progress < 0.2:
-                multiplier = 1.5
-            elif progress < 0.4:
-                multiplier = 2.0
-            elif progress < 0.7:
-                multiplier = 3.0
-            else:
-                multiplier = pattern.severity_multiplier
-        
+        if self.use_lut:
+            multiplier = self._lookup_multiplier(pattern, progress, elapsed)
         else:
-            # 其他异常类型：使用钟形曲线
-            # 在异常中期达到峰值，开始和结束时影响较小
-            bell_curve = math.exp(-((progress - 0.5) * 4) ** 2)
-            multiplier = 1.0 + (pattern.severity_multiplier - 1.0) * bell_curve
+            multiplier = pattern._multiplier_fn(progress, elapsed)
         
-        # 对于错误率指标，使用加法而不是乘法
+        # 对于错误率指标，按倍数的增量做加法而不是乘法
         if "error_rate" in metric_name:
-            return min(1.0, base_value + (pattern.severity_multiplier - 1.0) * 0.05 * bell_curve)
+            return min(1.0, base_value + (multiplier - 1.0) * 0.05)
         
         # 对于吞吐量指标，异常时应该降低
         if "requests_per_second" in metric_name:
@@ -333,6 +519,71 @@ class AnomalySimulator:
         # 对于其他指标，直接乘以倍数
         return base_value * multiplier
     
+    def _build_multiplier_lut(self, pattern: AnomalyPattern) -> np.ndarray:
+        """
+        构建异常模式的倍数查找表
+        
+        周期性异常按周期内相位取 _SINE_LUT_SIZE 个点，其他类型按进度 [0, 1] 取 _LUT_SIZE 个点。
+        
+        Args:
+            pattern: 异常模式
+            
+        Returns:
+            倍数数组
+        """
+        if pattern._mult_kind == _MULT_PERIODIC:
+            elapsed = np.arange(_SINE_LUT_SIZE) * (_PERIODIC_CYCLE_SECONDS / _SINE_LUT_SIZE)
+            return _multiplier_array(pattern, elapsed)
+        progress = np.arange(_LUT_SIZE) / (_LUT_SIZE - 1)
+        return _multiplier_array(pattern, progress * pattern._total_duration)
+    
+    def _lookup_multiplier(self, pattern: AnomalyPattern, progress: float, elapsed: float) -> float:
+        """按进度（周期性异常按相位）查表取倍数，查找表首次使用时构建并缓存在模式上"""
+        lut = pattern._multiplier_lut
+        if lut is None:
+            lut = self._build_multiplier_lut(pattern).tolist()
+            object.__setattr__(pattern, "_multiplier_lut", lut)
+        if pattern._mult_kind == _MULT_PERIODIC:
+            return lut[int(elapsed % _PERIODIC_CYCLE_SECONDS * (_SINE_LUT_SIZE / _PERIODIC_CYCLE_SECONDS))]
+        return lut[int(progress * (_LUT_SIZE - 1) + 0.5)]
+    
+    def apply_anomaly_to_timeseries(self,
+                                    base_values: np.ndarray,
+                                    timestamps: np.ndarray,
+                                    metric_name: str,
+                                    pattern: AnomalyPattern) -> np.ndarray:
+        """
+        将异常模式批量应用到一条指标时间序列上，逐点结果与 apply_anomaly_to_value 一致
+        
+        Args:
+            base_values: 基础值数组
+            timestamps: 与基础值等长的 datetime64 时间戳数组
+            metric_name: 指标名称
+            pattern: 异常模式
+            
+        Returns:
+            应用异常后的值数组
+        """
+        base_values = np.asarray(base_values, dtype=np.float64)
+        if metric_name not in pattern.affected_metrics:
+            return base_values.copy()
+        
+        # 异常进度（0-1），超出异常时间范围的点保持原值
+        elapsed = (np.asarray(timestamps) - np.datetime64(pattern.start_time)) / np.timedelta64(1, 's')
+        progress = elapsed / pattern._total_duration
+        in_window = (progress >= 0) & (progress <= 1)
+        
+        # 错误率指标按倍数的增量做加法，吞吐量指标降低，其他指标乘以倍数
+        multiplier = _multiplier_array(pattern, elapsed)
+        if "error_rate" in metric_name:
+            anomalous = np.minimum(1.0, base_values + (multiplier - 1.0) * 0.05)
+        elif "requests_per_second" in metric_name:
+            anomalous = base_values / multiplier
+        else:
+            anomalous = base_values * multiplier
+        
+        return np.where(in_window, anomalous, base_values)
+    
     def generate_anomaly_scenario(self, 
                                 scenario_name: str,
                                 base_time: datetime,
@@ -425,6 +676,28 @@ class AnomalySimulator:
         
         return patterns
     
+    def generate_anomaly_scenario_timebase(self,
+                                           scenario_name: str,
+                                           base_time: datetime,
+                                           duration_hours: int = 6,
+                                           step_seconds: int = 10) -> Tuple[np.ndarray, List[AnomalyPattern]]:
+        """
+        生成异常场景及其等间隔采样时间轴，时间轴可直接传给 apply_anomaly_to_timeseries
+        
+        Args:
+            scenario_name: 场景名称
+            base_time: 基准时间
+            duration_hours: 场景持续时间（小时）
+            step_seconds: 采样间隔（秒）
+        
+        Returns:
+            (datetime64[s] 时间戳数组, 异常模式列表)
+        """
+        patterns = self.generate_anomaly_scenario(scenario_name, base_time, duration_hours)
+        offsets = np.arange(0, duration_hours * 3600, step_seconds, dtype=np.int64).astype('timedelta64[s]')
+        timestamps = np.datetime64(base_time, 's') + offsets
+        return timestamps, patterns
+    
     def get_available_scenarios(self) -> List[str]:
         """
         获取可用的异常场景列表
@@ -450,30 +723,36 @@ class AnomalySimulator:
         Returns:
             异常时间线字典
         """
-        timeline = {
-            "scenario_summary": {
-                "total_patterns": len(patterns),
-                "start_time": min(p.start_time for p in patterns).isoformat(),
-                "end_time": max(p.start_time + timedelta(minutes=p.duration_minutes) 
-                               for p in patterns).isoformat()
-            },
-            "anomaly_patterns": []
-        }
+        anomaly_patterns = []
+        first = last = None
         
+        # 一次遍历同时找出最早开始和最晚结束的模式
         for i, pattern in enumerate(patterns):
-            timeline["anomaly_patterns"].append({
+            if first is None or pattern._start_epoch < first._start_epoch:
+                first = pattern
+            if last is None or pattern._end_epoch > last._end_epoch:
+                last = pattern
+            
+            anomaly_patterns.append({
                 "id": i + 1,
                 "type": pattern.anomaly_type.value,
-                "start_time": pattern.start_time.isoformat(),
-                "end_time": (pattern.start_time + timedelta(minutes=pattern.duration_minutes)).isoformat(),
+                "start_time": pattern._start_iso,
+                "end_time": pattern._end_iso,
                 "duration_minutes": pattern.duration_minutes,
                 "severity_multiplier": pattern.severity_multiplier,
-                "affected_metrics": pattern.affected_metrics,
+                "affected_metrics": sorted(pattern.affected_metrics),
                 "description": pattern.description,
                 "recovery_time_minutes": pattern.recovery_time_minutes
             })
         
-        return timeline
+        return {
+            "scenario_summary": {
+                "total_patterns": len(anomaly_patterns),
+                "start_time": first._start_iso if first else None,
+                "end_time": last._end_iso if last else None
+            },
+            "anomaly_patterns": anomaly_patterns
+        }
 
 
 if __name__ == "__main__":
@@ -493,7 +772,7 @@ if __name__ == "__main__":
     # 导出时间线
     timeline = simulator.export_anomaly_timeline(patterns)
     
-    with open("anomaly_timeline.json", "w", encoding="utf-8") as f:
-        json.dump(timeline, f, indent=2, ensure_ascii=False)
+    with open("anomaly_timeline.json", "wb") as f:
+        f.write(_dumps(timeline))
     
     print("异常时间线已保存到 anomaly_timeline.json")
\ No newline at end of file
@@ -15,13 +15,29 @@
 """
 
 import os
+import re
 import shutil
-import glob
+import stat
+import sys
+import fnmatch
 import zipfile
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# 并行统计目录大小的线程数
+SCAN_WORKERS = 8
+
+# 并发删除文件的线程数，删除的系统调用期间会释放 GIL
+DELETE_WORKERS = 16
+
+# 已压缩格式的文件备份时直接存储，不再压缩
+COMPRESSED_SUFFIXES = {'.zip', '.gz', '.xz', '.parquet'}
+
+# 文件大小显示单位，逐级相差 1024 倍
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 class TestFilesCleaner:
     """测试文件清理器类"""
@@ -51,6 +67,13 @@ class TestFilesCleaner:
             '*.log'
         ]
         
+        # 全部文件模式合成一个正则，每个模式一个命名分组(p0, p1, ...)以便找回匹配的模式；
+        # 与 glob 一致，Windows 下不区分大小写
+        self._pattern_re = re.compile(
+            '|'.join(f'(?P<p{i}>{fnmatch.translate(pattern)})' for i, pattern in enumerate(self.cleanup_patterns)),
+            re.IGNORECASE if os.name == 'nt' else 0
+        )
+        
         # 要清理的目录
         self.cleanup_dirs = [
             'test_reports',
@@ -67,43 +90,67 @@ class TestFilesCleaner:
         self.cleaned_files = []
         self.cleaned_dirs = []
         self.errors = []
+        
+        # 最近一次扫描结果，实际删除文件后失效
+        self._scan_cache = None
+        
+        # 逐项日志行缓冲，清理结束后一次性写出
+        self._log_buffer: List[str] = []
     
-    def scan_files(self) -> Dict[str, List[str]]:
-        """扫描要清理的文件和目录
+    def scan_files(self, force: bool = False) -> Dict[str, List[str]]:
+        """扫描要清理的文件和目录，结果会被缓存供备份、确认和清理复用
         
+        Args:
+            force: 是否忽略缓存重新扫描
+            
         Returns:
             包含文件和目录列表的字典
         """
+        if self._scan_cache is not None and not force:
+            return self._scan_cache
+        
         scan_result = {
             'files': [],
             'directories': [],
             'total_size': 0
         }
         
-        # 扫描文件
-        for pattern in self.cleanup_patterns:
-            files = glob.glob(str(self.base_dir / pattern))
-            for file_path in files:
-                if os.path.isfile(file_path):
-                    file_size = os.path.getsize(file_path)
+        # 扫描文件：只遍历一次基础目录，用合成的正则匹配文件名；
+        # 每个候选只 stat 一次，类型判断和大小共用结果
+        if self.base_dir.is_dir():
+            with os.scandir(self.base_dir) as entries:
+                for entry in entries:
+                    # 与 glob 一致，通配符不匹配隐藏文件
+                    if entry.name.startswith('.'):
+                        continue
+                    match = self._pattern_re.match(entry.name)
+                    if not match:
+                        continue
+                    try:
+                        file_stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if not stat.S_ISREG(file_stat.st_mode):
+                        continue
                     scan_result['files'].append({
-                        'path': file_path,
-                        'size': file_size,
-                        'pattern': pattern
+                        'path': entry.path,
+                        'size': file_stat.st_size,
+                        'pattern': self.cleanup_patterns[int(match.lastgroup[1:])]
                     })
-                    scan_result['total_size'] += file_size
+                    scan_result['total_size'] += file_stat.st_size
         
-        # 扫描目录
-        for dir_name in self.cleanup_dirs:
-            dir_path = self.base_dir / dir_name
-            if dir_path.exists() and dir_path.is_dir():
-                dir_size = self._get_dir_size(dir_path)
+        # 扫描目录，各目录大小在线程池中并行统计
+        dir_paths = [self.base_dir / dir_name for dir_name in self.cleanup_dirs]
+        dir_paths = [dir_path for dir_path in dir_paths if dir_path.is_dir()]
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            for dir_path, dir_size in zip(dir_paths, executor.map(self._get_dir_size, dir_paths)):
                 scan_result['directories'].append({
                     'path': str(dir_path),
                     'size': dir_size
                 })
                 scan_result['total_size'] += dir_size
         
+        self._scan_cache = scan_result
         return scan_result
     
     def _get_dir_size(self, dir_path: Path) -> int:
@@ -116,12 +163,16 @@ class TestFilesCleaner:
             目录大小（字节）
         """
         total_size = 0
+        pending = [dir_path]
         try:
-            for dirpath, dirnames, filenames in os.walk(dir_path):
-                for filename in filenames:
-                    file_path = os.path.join(dirpath, filename)
-                    if os.path.exists(file_path):
-                        total_size += os.path.getsize(file_path)
+            # os.scandir 的目录项自带文件类型，stat 结果也会缓存；符号链接不跟随、不计入
+            while pending:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
         except Exception as e:
             self.errors.append(f"计算目录大小失败 {dir_path}: {e}")
         return total_size
@@ -135,14 +186,11 @@ class TestFilesCleaner:
         Returns:
             格式化的大小字符串
         """
-        if size_bytes < 1024:
+        # 单位序号由二进制位数直接算出：每 10 位(1024 倍)进一级
+        unit_index = min(max(0, (size_bytes.bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+        if unit_index == 0:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 * 1024 * 1024:
-            return f"{size_bytes / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
+        return f"{size_bytes / (1 << (10 * unit_index)):.1f} {SIZE_UNITS[unit_index]}"
     
     def backup_files(self, backup_path: str = None) -> str:
         """备份要清理的文件
@@ -166,25 +214,23 @@ class TestFilesCleaner:
         print(f"📦 开始备份文件到: {backup_path}")
         
         try:
-            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            backup_count = 0
+            with zipfile.ZipFile(backup_path, 'w', allowZip64=True) as zipf:
                 # 备份文件
                 for file_info in scan_result['files']:
-                    file_path = file_info['path']
-                    arcname = os.path.relpath(file_path, self.base_dir)
-                    zipf.write(file_path, arcname)
-                    print(f"  备份文件: {arcname}")
+                    self._write_backup_entry(zipf, Path(file_info['path']))
+                    backup_count += 1
                 
                 # 备份目录
                 for dir_info in scan_result['directories']:
                     dir_path = Path(dir_info['path'])
                     for file_path in dir_path.rglob('*'):
                         if file_path.is_file():
-                            arcname = os.path.relpath(file_path, self.base_dir)
-                            zipf.write(file_path, arcname)
-                            print(f"  备份文件: {arcname}")
+                            self._write_backup_entry(zipf, file_path)
+                            backup_count += 1
             
             backup_size = os.path.getsize(backup_path)
-            print(f"✅ 备份完成，备份文件大小: {self._format_size(backup_size)}")
+            print(f"✅ 备份完成，共备份 {backup_count} 个文件，备份文件大小: {self._format_size(backup_size)}")
             return backup_path
             
         except Exception as e:
@@ -193,6 +239,35 @@ class TestFilesCleaner:
             print(f"❌ {error_msg}")
             return None
     
+    def _write_backup_entry(self, zipf: zipfile.ZipFile, file_path: Path):
+        """将单个文件写入备份，已压缩格式直接存储，其余使用最快的压缩级别
+        
+        Args:
+            zipf: 备份压缩包
+            file_path: 文件路径
+        """
+        arcname = os.path.relpath(file_path, self.base_dir)
+        if file_path.suffix.lower() in COMPRESSED_SUFFIXES:
+            zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+        else:
+            zipf.write(file_path, arcname, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+    
+    @staticmethod
+    def _remove_file(file_path: str) -> Optional[Exception]:
+        """删除单个文件，失败时返回异常而不抛出，便于在线程池中批量收集
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            删除失败时的异常，成功时为 None
+        """
+        try:
+            os.remove(file_path)
+        except Exception as e:
+            return e
+        return None
+    
     def clean_files(self, dry_run: bool = False) -> Dict[str, int]:
         """清理文件
         
@@ -212,24 +287,30 @@ class TestFilesCleaner:
         print(f"🧹 开始{action}测试文件...")
         
         stats = {'files': 0, 'directories': 0, 'size': 0}
+        log = self._log_buffer
         
-        # 清理文件
-        for file_info in scan_result['files']:
+        # 清理文件：删除操作在线程池中并发执行，结果仍按扫描顺序处理
+        files = scan_result['files']
+        if dry_run:
+            remove_errors = [None] * len(files)
+        else:
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                remove_errors = list(executor.map(self._remove_file, [file_info['path'] for file_info in files]))
+        
+        for file_info, error in zip(files, remove_errors):
             file_path = file_info['path']
             file_size = file_info['size']
             
             if dry_run:
-                print(f"  [试运行] 将删除文件: {file_path} ({self._format_size(file_size)})")
+                log.append(f"  [试运行] 将删除文件: {file_path} ({self._format_size(file_size)})\n")
+            elif error is None:
+                self.cleaned_files.append(file_path)
+                log.append(f"  删除文件: {file_path} ({self._format_size(file_size)})\n")
             else:
-                try:
-                    os.remove(file_path)
-                    self.cleaned_files.append(file_path)
-                    print(f"  删除文件: {file_path} ({self._format_size(file_size)})")
-                except Exception as e:
-                    error_msg = f"删除文件失败 {file_path}: {e}"
-                    self.errors.append(error_msg)
-                    print(f"  ❌ {error_msg}")
-                    continue
+                error_msg = f"删除文件失败 {file_path}: {error}"
+                self.errors.append(error_msg)
+                log.append(f"  ❌ {error_msg}\n")
+                continue
             
             stats['files'] += 1
             stats['size'] += file_size
@@ -240,21 +321,26 @@ class TestFilesCleaner:
             dir_size = dir_info['size']
             
             if dry_run:
-                print(f"  [试运行] 将删除目录: {dir_path} ({self._format_size(dir_size)})")
+                log.append(f"  [试运行] 将删除目录: {dir_path} ({self._format_size(dir_size)})\n")
             else:
                 try:
                     shutil.rmtree(dir_path)
                     self.cleaned_dirs.append(dir_path)
-                    print(f"  删除目录: {dir_path} ({self._format_size(dir_size)})")
+                    log.append(f"  删除目录: {dir_path} ({self._format_size(dir_size)})\n")
                 except Exception as e:
                     error_msg = f"删除目录失败 {dir_path}: {e}"
                     self.errors.append(error_msg)
-                    print(f"  ❌ {error_msg}")
+                    log.append(f"  ❌ {error_msg}\n")
                     continue
             
             stats['directories'] += 1
             stats['size'] += dir_size
         
+        sys.stdout.writelines(log)
+        log.clear()
+        
+        if not dry_run:
+            self._scan_cache = None
         return stats
     
     def print_summary(self, stats: Dict[str, int], dry_run: bool = False):
@@ -16,17 +16,213 @@ Date: 2025-01-10
 """
 
 import os
+import re
+import hashlib
 import json
+import mmap
 import yaml
 import shutil
+import sys
+import time
 import argparse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-import configparser
+from functools import lru_cache
 
-@dataclass
+# 批量验证配置文件的线程数
+VALIDATE_WORKERS = 8
+
+# 不小于该大小(字节)的 JSON 配置通过 mmap 读取
+MMAP_THRESHOLD = 64 * 1024
+
+# 持久化验证缓存的默认位置
+DEFAULT_PARSE_CACHE_PATH = os.path.expanduser("~/.cache/aiops/configcache.json")
+
+# 可选依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# 优先使用 libyaml 的 C 实现解析 YAML，未编译 libyaml 时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+# 解析后端标识，写入持久化验证缓存；后端不同时不复用缓存的结论
+_PARSE_BACKEND = f"{'orjson' if ORJSON_AVAILABLE else 'json'}+{YamlSafeLoader.__name__}"
+
+def _content_hash(data: bytes) -> str:
+    """计算文件内容哈希，优先使用 xxh3_64，回退到 8 字节的 blake2b；带算法前缀以免混用"""
+    if XXHASH_AVAILABLE:
+        return f"xxh3:{xxhash.xxh3_64_hexdigest(data)}"
+    return f"blake2b:{hashlib.blake2b(data, digest_size=8).hexdigest()}"
+
+def _cached_verdict(entry: Any, content_hash: str) -> Optional[Dict[str, Any]]:
+    """从持久化缓存条目中取出验证结论
+    
+    Args:
+        entry: 缓存条目，来自磁盘文件，结构不可信
+        content_hash: 当前文件内容哈希
+        
+    Returns:
+        哈希与解析后端都一致且结构完整时返回结论，否则返回 None（按未命中处理）
+    """
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("hash") != content_hash or entry.get("backend") != _PARSE_BACKEND:
+        return None
+    verdict = entry.get("verdict")
+    if not isinstance(verdict, dict) or not isinstance(verdict.get("valid"), bool):
+        return None
+    return verdict
+
+def _read_parse_cache(path: Path) -> Dict[str, Any]:
+    """读取持久化验证缓存，文件缺失或损坏时返回空缓存"""
+    try:
+        data = path.read_bytes()
+        cache = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data.decode('utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _flush_parse_cache(path: Path, updates: Dict[str, Dict[str, Any]]) -> None:
+    """把新条目合并进磁盘上当前的缓存文件后原子写回，共用同一缓存文件的其他管理器写入的条目不会丢失
+    
+    Args:
+        path: 缓存文件路径
+        updates: 尚未落盘的条目，写入成功后清空
+    """
+    if not updates:
+        return
+    
+    cache = _read_parse_cache(path)
+    cache.update(updates)
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(cache)
+    else:
+        data = json.dumps(cache, ensure_ascii=False).encode('utf-8')
+    
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, data)
+        updates.clear()
+    except OSError:
+        # 缓存只是加速手段，写入失败时下次重新解析即可
+        pass
+
+def _write_atomic(target: Path, data: bytes) -> None:
+    """原子地写入文件：先写同目录下的临时文件并 fsync，再用 os.replace 替换目标，不会留下写了一半的文件
+    
+    Args:
+        target: 目标文件路径
+        data: 文件内容
+    """
+    # 目标是符号链接时写入其指向的文件，而不是用普通文件替换掉链接本身
+    if target.is_symlink():
+        target = target.resolve()
+    tmp_path = target.with_name(f"{target.name}.tmp.{os.getpid()}")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # 覆盖已有文件时沿用其权限
+        try:
+            shutil.copymode(target, tmp_path)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _check_json(data) -> None:
+    """检查 JSON 语法，优先使用 orjson
+    
+    orjson 比标准库严格（拒绝 NaN/Infinity、单独的代理项转义等），它报错时再用标准库确认，
+    结论与是否安装 orjson 无关
+    
+    Args:
+        data: UTF-8 编码的 JSON 内容（bytes 或 memoryview）
+        
+    Raises:
+        ValueError: 标准库也无法解析
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            orjson.loads(data)
+            return
+        except orjson.JSONDecodeError:
+            pass
+    json.loads(str(data, 'utf-8'))
+
+# INI 行语法，与 configparser 默认设置一致：[节标题]，"键 = 值" 或 "键: 值"
+_INI_SECTION_RE = re.compile(r'\[(?P<header>.+)\]')
+_INI_OPTION_RE = re.compile(r'(?P<option>.*?)\s*[=:]\s*.*$')
+
+
+def _check_ini_syntax(text: str) -> None:
+    """按 configparser 的默认语法单遍扫描 INI 文本，只检查结构，不构建配置对象
+    
+    Args:
+        text: INI 文件内容
+        
+    Raises:
+        ValueError: 缺少节标题、无法解析的行、重复的节或键
+    """
+    seen = set()
+    section = None
+    in_option = False
+    indent_level = 0
+    # 与 configparser 一样只按 \n 分行；str.splitlines 还会在 \x0b、\x1c、\u2028 等字符处断行
+    for lineno, line in enumerate(text.split('\n'), start=1):
+        line = line.removesuffix('\r')
+        value = line.strip()
+        # 空行和以 # 或 ; 开头的注释行
+        if not value or value[0] in '#;':
+            continue
+        
+        # 比当前键缩进更深的行是多行值的续行
+        cur_indent = len(line) - len(line.lstrip())
+        if in_option and cur_indent > indent_level:
+            continue
+        indent_level = cur_indent
+        
+        match = _INI_SECTION_RE.match(value)
+        if match:
+            section = match.group('header')
+            # DEFAULT 节可以重复出现
+            if section != 'DEFAULT':
+                if section in seen:
+                    raise ValueError(f"第 {lineno} 行: 重复的节 [{section}]")
+                seen.add(section)
+            in_option = False
+        elif section is None:
+            raise ValueError(f"第 {lineno} 行: 缺少节标题: {line!r}")
+        else:
+            match = _INI_OPTION_RE.match(value)
+            if not match or not match.group('option'):
+                raise ValueError(f"第 {lineno} 行: 无法解析: {line!r}")
+            key = (section, match.group('option').rstrip().lower())
+            if key in seen:
+                raise ValueError(f"第 {lineno} 行: 节 [{section}] 中重复的键 {key[1]}")
+            seen.add(key)
+            in_option = True
+
+@dataclass(slots=True, frozen=True)
 class ConfigFile:
     """配置文件信息类"""
     name: str
@@ -37,132 +233,243 @@ class ConfigFile:
     environment: str = "all"
     required: bool = True
     template_available: bool = False
+    
+    def __post_init__(self):
+        # 取值只有少数几种的字段驻留为同一字符串对象，比较时可按身份直接命中
+        for field_name in ("format", "category", "environment"):
+            object.__setattr__(self, field_name, sys.intern(getattr(self, field_name)))
+
+def _build_default_registry() -> Dict[str, ConfigFile]:
+    """构建默认的配置文件注册表"""
+    registry = {}
+    
+    # 测试场景配置
+    registry["test_config"] = ConfigFile(
+        name="test_config.json",
+        path="test_config.json",
+        format="json",
+        category="test_scenario",
+        description="测试场景参数配置",
+        template_available=True
+    )
+    
+    registry["project_configs"] = ConfigFile(
+        name="project_configs.json",
+        path="project_configs.json",
+        format="json",
+        category="test_scenario",
+        description="多项目负载测试配置",
+        template_available=True
+    )
+    
+    # AI引擎配置
+    registry["ai_engine_default"] = ConfigFile(
+        name="default.yaml",
+        path="../ai-engine/config/default.yaml",
+        format="yaml",
+        category="application",
+        description="AI引擎默认配置",
+        environment="all",
+        template_available=True
+    )
+    
+    registry["ai_engine_production"] = ConfigFile(
+        name="production.yaml",
+        path="../ai-engine/config/production.yaml",
+        format="yaml",
+        category="application",
+        description="AI引擎生产环境配置",
+        environment="production",
+        template_available=True
+    )
+    
+    registry["ai_engine_test"] = ConfigFile(
+        name="test.yaml",
+        path="../ai-engine/config/test.yaml",
+        format="yaml",
+        category="application",
+        description="AI引擎测试环境配置",
+        environment="test",
+        template_available=True
+    )
+    
+    # 基础设施配置
+    registry["elasticsearch"] = ConfigFile(
+        name="elasticsearch.yml",
+        path="../configs/elasticsearch/elasticsearch.yml",
+        format="yaml",
+        category="infrastructure",
+        description="Elasticsearch配置",
+        template_available=True
+    )
+    
+    registry["prometheus"] = ConfigFile(
+        name="prometheus.yml",
+        path="../configs/prometheus/prometheus.yml",
+        format="yaml",
+        category="infrastructure",
+        description="Prometheus监控配置",
+        template_available=True
+    )
+    
+    registry["grafana"] = ConfigFile(
+        name="grafana.ini",
+        path="../configs/grafana/grafana.ini",
+        format="ini",
+        category="infrastructure",
+        description="Grafana仪表板配置",
+        template_available=True
+    )
+    
+    # 容器编排配置
+    registry["docker_compose"] = ConfigFile(
+        name="docker-compose.yml",
+        path="../docker-compose.yml",
+        format="yaml",
+        category="orchestration",
+        description="Docker Compose主配置",
+        template_available=True
+    )
+    
+    registry["helm_values"] = ConfigFile(
+        name="values.yaml",
+        path="../helm/values.yaml",
+        format="yaml",
+        category="orchestration",
+        description="Helm Chart配置",
+        environment="kubernetes",
+        template_available=True
+    )
+    
+    # 自愈系统配置
+    registry["self_healing_rules"] = ConfigFile(
+        name="system-rules.yaml",
+        path="../self-healing/rules/system-rules.yaml",
+        format="yaml",
+        category="self_healing",
+        description="系统自愈规则配置",
+        template_available=True
+    )
+    
+    return registry
+
+# 默认注册表只在导入时构建一次，各 ConfigManager 实例复制使用
+_DEFAULT_REGISTRY = _build_default_registry()
+
+# 配置模板内容，按配置文件名(不含扩展名)索引
+_TEMPLATES = {
+    "test_config": '''
+{
+  "scenario_generator": {
+    "web_application": {
+      "base_response_time_ms": 150,
+      "base_throughput_rps": 100,
+      "base_error_rate": 0.02,
+      "base_cpu_usage": 0.45,
+      "base_memory_usage": 0.60,
+      "anomaly_probability": 0.05
+    },
+    "database": {
+      "base_query_time_ms": 25,
+      "base_connections": 50,
+      "base_cpu_usage": 0.35,
+      "base_memory_usage": 0.70,
+      "anomaly_probability": 0.03
+    }
+  }
+}
+''',
+    "project_configs": '''
+{
+  "basic_load_test": [
+    {
+      "type": "java",
+      "name": "basic-java-service",
+      "introduce_error": false,
+      "description": "基础Java微服务"
+    }
+  ]
+}
+''',
+    "ai_engine_default": '''
+# AI引擎配置模板
+app:
+  name: "AIOps AI Engine"
+  version: "1.0.0"
+  debug: false
+  host: "0.0.0.0"
+  port: 8000
+
+database:
+  primary:
+    type: "postgresql"
+    host: "localhost"
+    port: 5432
+    database: "aiops"
+    username: "aiops"
+    password: "your_password_here"
+
+redis:
+  host: "localhost"
+  port: 6379
+  password: ""
+  db: 0
+'''
+}
 
 class ConfigManager:
     """配置文件管理器"""
     
-    def __init__(self, base_path: str = "."):
+    def __init__(self, base_path: str = ".", parse_cache_path: Optional[str] = None):
         """初始化配置管理器
         
         Args:
             base_path: 基础路径
+            parse_cache_path: 持久化验证缓存文件路径，为 None 时只在进程内缓存
         """
         self.base_path = Path(base_path)
-        self.config_registry = self._build_config_registry()
-        
-    def _build_config_registry(self) -> Dict[str, ConfigFile]:
-        """构建配置文件注册表"""
-        registry = {}
-        
-        # 测试场景配置
-        registry["test_config"] = ConfigFile(
-            name="test_config.json",
-            path="test_config.json",
-            format="json",
-            category="test_scenario",
-            description="测试场景参数配置",
-            template_available=True
-        )
-        
-        registry["project_configs"] = ConfigFile(
-            name="project_configs.json",
-            path="project_configs.json",
-            format="json",
-            category="test_scenario",
-            description="多项目负载测试配置",
-            template_available=True
-        )
-        
-        # AI引擎配置
-        registry["ai_engine_default"] = ConfigFile(
-            name="default.yaml",
-            path="../ai-engine/config/default.yaml",
-            format="yaml",
-            category="application",
-            description="AI引擎默认配置",
-            environment="all",
-            template_available=True
-        )
-        
-        registry["ai_engine_production"] = ConfigFile(
-            name="production.yaml",
-            path="../ai-engine/config/production.yaml",
-            format="yaml",
-            category="application",
-            description="AI引擎生产环境配置",
-            environment="production",
-            template_available=True
-        )
-        
-        registry["ai_engine_test"] = ConfigFile(
-            name="test.yaml",
-            path="../ai-engine/config/test.yaml",
-            format="yaml",
-            category="application",
-            description="AI引擎测试环境配置",
-            environment="test",
-            template_available=True
-        )
-        
-        # 基础设施配置
-        registry["elasticsearch"] = ConfigFile(
-            name="elasticsearch.yml",
-            path="../configs/elasticsearch/elasticsearch.yml",
-            format="yaml",
-            category="infrastructure",
-            description="Elasticsearch配置",
-            template_available=True
-        )
-        
-        registry["prometheus"] = ConfigFile(
-            name="prometheus.yml",
-            path="../configs/prometheus/prometheus.yml",
-            format="yaml",
-            category="infrastructure",
-            description="Prometheus监控配置",
-            template_available=True
-        )
-        
-        registry["grafana"] = ConfigFile(
-            name="grafana.ini",
-            path="../configs/grafana/grafana.ini",
-            format="ini",
-            category="infrastructure",
-            description="Grafana仪表板配置",
-            template_available=True
-        )
-        
-        # 容器编排配置
-        registry["docker_compose"] = ConfigFile(
-            name="docker-compose.yml",
-            path="../docker-compose.yml",
-            format="yaml",
-            category="orchestration",
-            description="Docker Compose主配置",
-            template_available=True
-        )
-        
-        registry["helm_values"] = ConfigFile(
-            name="values.yaml",
-            path="../helm/values.yaml",
-            format="yaml",
-            category="orchestration",
-            description="Helm Chart配置",
-            environment="kubernetes",
-            template_available=True
-        )
-        
-        # 自愈系统配置
-        registry["self_healing_rules"] = ConfigFile(
-            name="system-rules.yaml",
-            path="../self-healing/rules/system-rules.yaml",
-            format="yaml",
-            category="self_healing",
-            description="系统自愈规则配置",
-            template_available=True
-        )
-        
-        return registry
+        self.config_registry = dict(_DEFAULT_REGISTRY)
+        
+        # 各配置文件的完整路径：键名 -> (拼接时的 ConfigFile, 路径)，注册表条目新增或替换后按需重新拼接
+        self._config_paths: Dict[str, Tuple[ConfigFile, Path]] = {
+            key: (config, self.base_path / config.path) for key, config in self.config_registry.items()
+        }
+        
+        # 按分类、环境预建索引，注册表变化后在下次查询时重建
+        self._by_category: Dict[str, List[ConfigFile]] = {}
+        self._by_env: Dict[str, List[ConfigFile]] = {}
+        self._indexed_registry: Dict[str, ConfigFile] = {}
+        self._sync_indexes()
+        
+        # 验证结果缓存：路径 -> (mtime_ns, 文件大小, 验证结果)，文件未变化时不再重新解析
+        self._parse_cache: Dict[str, tuple] = {}
+        
+        # 持久化验证缓存：绝对路径 -> {"hash": 内容哈希, "backend": 解析后端, "verdict": 验证结论}，
+        # 按内容哈希判断是否变化，不受 git checkout 等改写 mtime 的影响
+        self._disk_cache_path = Path(parse_cache_path) if parse_cache_path else None
+        self._disk_cache: Dict[str, Dict[str, Any]] = {}
+        # 本进程新写入、尚未落盘的条目；管理器被回收或进程退出时合并写回，不持有管理器本身
+        self._disk_cache_updates: Dict[str, Dict[str, Any]] = {}
+        if self._disk_cache_path is not None:
+            self._disk_cache = _read_parse_cache(self._disk_cache_path)
+            weakref.finalize(self, _flush_parse_cache, self._disk_cache_path, self._disk_cache_updates)
+        
+    def _sync_indexes(self) -> None:
+        """注册表与建索引时的快照不一致时重建分类、环境索引
+        
+        环境索引的每个桶都包含通用("all")配置，保持注册表顺序
+        """
+        if self._indexed_registry == self.config_registry:
+            return
+        
+        self._by_category = {}
+        self._by_env = {}
+        environments = {config.environment for config in self.config_registry.values()}
+        for config in self.config_registry.values():
+            self._by_category.setdefault(config.category, []).append(config)
+            for env in (environments if config.environment == "all" else (config.environment,)):
+                self._by_env.setdefault(env, []).append(config)
+        self._indexed_registry = dict(self.config_registry)
     
     def list_configs(self, category: Optional[str] = None, environment: Optional[str] = None) -> List[ConfigFile]:
         """列出配置文件
@@ -174,22 +481,41 @@ class ConfigManager:
         Returns:
             配置文件列表
         """
-        configs = list(self.config_registry.values())
+        self._sync_indexes()
+        
+        if category and environment:
+            return [c for c in self._by_category.get(category, ()) if c.environment in (environment, "all")]
         
         if category:
-            configs = [c for c in configs if c.category == category]
-            
+            return list(self._by_category.get(category, ()))
+        
         if environment:
-            configs = [c for c in configs if c.environment in [environment, "all"]]
-            
-        return configs
+            # 未登记的环境只匹配通用配置
+            return list(self._by_env.get(environment, self._by_env.get("all", ())))
+        
+        return list(self.config_registry.values())
     
     def get_config_categories(self) -> List[str]:
         """获取所有配置分类"""
-        categories = set()
-        for config in self.config_registry.values():
-            categories.add(config.category)
-        return sorted(list(categories))
+        self._sync_indexes()
+        return sorted(self._by_category)
+    
+    def get_config_path(self, config_key: str) -> Path:
+        """获取配置文件的完整路径
+        
+        Args:
+            config_key: 配置文件键名
+            
+        Returns:
+            基础路径下的配置文件路径
+        """
+        config = self.config_registry[config_key]
+        cached = self._config_paths.get(config_key)
+        if cached is not None and cached[0] is config:
+            return cached[1]
+        path = self.base_path / config.path
+        self._config_paths[config_key] = (config, path)
+        return path
     
     def validate_config(self, config_key: str) -> Dict[str, Any]:
         """验证配置文件
@@ -207,32 +533,84 @@ class ConfigManager:
             }
         
         config = self.config_registry[config_key]
-        config_path = self.base_path / config.path
+        config_path = self.get_config_path(config_key)
         
-        # 检查文件是否存在
-        if not config_path.exists():
+        # 检查文件是否存在，stat 结果同时用于缓存校验和返回的文件信息
+        try:
+            file_stat = config_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
             return {
                 "valid": False,
                 "error": f"配置文件不存在: {config_path}"
             }
+        except OSError as e:
+            return {
+                "valid": False,
+                "error": f"无法访问配置文件: {str(e)}"
+            }
         
+        # 修改时间和大小都未变化时直接复用上次的验证结果（包括格式错误）
+        cache_key = str(config_path)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None and cached[:2] == (file_stat.st_mtime_ns, file_stat.st_size):
+            return dict(cached[2])
+        
+        # 持久化缓存：内容哈希与记录一致时沿用上次的验证结论
+        disk_key = content_hash = verdict = None
+        if self._disk_cache_path is not None:
+            disk_key = os.path.abspath(config_path)
+            try:
+                content_hash = _content_hash(config_path.read_bytes())
+            except OSError:
+                pass
+            if content_hash is not None:
+                verdict = _cached_verdict(self._disk_cache.get(disk_key), content_hash)
+        
+        if verdict is None:
+            verdict = self._parse_config(config, config_path, file_stat)
+            if content_hash is not None:
+                entry = {"hash": content_hash, "backend": _PARSE_BACKEND, "verdict": verdict}
+                self._disk_cache[disk_key] = self._disk_cache_updates[disk_key] = entry
+        
+        result = dict(verdict)
+        if result["valid"]:
+            result["size"] = file_stat.st_size
+            result["modified"] = datetime.fromtimestamp(file_stat.st_mtime)
+        
+        self._parse_cache[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, result)
+        return dict(result)
+    
+    def _parse_config(self, config: ConfigFile, config_path: Path, file_stat: os.stat_result) -> Dict[str, Any]:
+        """按格式解析配置文件
+        
+        Args:
+            config: 配置文件信息
+            config_path: 配置文件路径
+            file_stat: 配置文件的 stat 结果
+            
+        Returns:
+            验证结论（不含文件大小和修改时间）
+        """
         # 根据格式验证文件
         try:
             if config.format == "json":
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    json.load(f)
+                if ORJSON_AVAILABLE and file_stat.st_size >= MMAP_THRESHOLD:
+                    # 大文件映射到内存后直接交给 orjson，不再复制出一份完整的 bytes
+                    with open(config_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            _check_json(view)
+                else:
+                    _check_json(config_path.read_bytes())
             elif config.format == "yaml":
+                # 只组装节点树、不构造 Python 对象；多文档、未定义锚点等结构错误仍能发现
                 with open(config_path, 'r', encoding='utf-8') as f:
-                    yaml.safe_load(f)
+                    yaml.compose(f, Loader=YamlSafeLoader)
             elif config.format == "ini":
-                parser = configparser.ConfigParser()
-                parser.read(config_path, encoding='utf-8')
+                _check_ini_syntax(config_path.read_text(encoding='utf-8'))
             
             return {
                 "valid": True,
-                "message": "配置文件格式正确",
-                "size": config_path.stat().st_size,
-                "modified": datetime.fromtimestamp(config_path.stat().st_mtime)
+                "message": "配置文件格式正确"
             }
             
         except Exception as e:
@@ -241,6 +619,29 @@ class ConfigManager:
                 "error": f"配置文件格式错误: {str(e)}"
             }
     
+    def save_parse_cache(self):
+        """将本进程新写入的验证缓存条目合并到磁盘上的缓存文件，没有变化时跳过"""
+        if self._disk_cache_path is not None:
+            _flush_parse_cache(self._disk_cache_path, self._disk_cache_updates)
+    
+    def validate_all(self, config_keys: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """并发验证多个配置文件
+        
+        Args:
+            config_keys: 配置文件键名列表，默认为注册表中的全部配置
+            
+        Returns:
+            配置文件键名到验证结果的映射
+        """
+        if config_keys is None:
+            config_keys = list(self.config_registry)
+        if not config_keys:
+            return {}
+        
+        # 文件读取和 C 扩展解析期间会释放 GIL，多个文件的 I/O 等待可以重叠
+        with ThreadPoolExecutor(max_workers=min(VALIDATE_WORKERS, len(config_keys))) as executor:
+            return dict(zip(config_keys, executor.map(self.validate_config, config_keys)))
+    
     def backup_config(self, config_key: str, backup_dir: Optional[str] = None) -> Dict[str, Any]:
         """备份配置文件
         
@@ -258,29 +659,39 @@ class ConfigManager:
             }
         
         config = self.config_registry[config_key]
-        config_path = self.base_path / config.path
-        
-        if not config_path.exists():
-            return {
-                "success": False,
-                "error": f"配置文件不存在: {config_path}"
-            }
+        config_path = self.get_config_path(config_key)
         
-        # 创建备份目录
+        # 确定备份目录
         if backup_dir is None:
             backup_dir = self.base_path / "config_backups"
         else:
             backup_dir = Path(backup_dir)
         
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 生成备份文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # 生成备份文件名：纳秒级 Unix 时间的十六进制，按字典序即按时间排序，同一秒内多次备份也不会重名
+        timestamp = f"{time.time_ns():x}"
         backup_filename = f"{config.name}.{timestamp}.backup"
         backup_path = backup_dir / backup_filename
         
+        # 先打开源文件，省去单独的 exists() 调用；源文件不存在时也不会留下空的备份目录
         try:
-            shutil.copy2(config_path, backup_path)
+            src = open(config_path, 'rb')
+        except (FileNotFoundError, NotADirectoryError):
+            return {
+                "success": False,
+                "error": f"配置文件不存在: {config_path}"
+            }
+        except OSError as e:
+            return {
+                "success": False,
+                "error": f"备份失败: {str(e)}"
+            }
+        
+        try:
+            with src:
+                backup_dir.mkdir(parents=True, exist_ok=True)
+                # 备份只需要文件内容，不复制权限和时间戳等元数据
+                with open(backup_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
             return {
                 "success": True,
                 "backup_path": str(backup_path),
@@ -310,7 +721,7 @@ class ConfigManager:
             }
         
         config = self.config_registry[config_key]
-        config_path = self.base_path / config.path
+        config_path = self.get_config_path(config_key)
         backup_file = Path(backup_path)
         
         if not backup_file.exists():
@@ -320,22 +731,28 @@ class ConfigManager:
             }
         
         try:
-            # 备份当前文件
-            if config_path.exists():
-                current_backup = self.backup_config(config_key)
-                if not current_backup["success"]:
-                    return {
-                        "success": False,
-                        "error": f"无法备份当前配置: {current_backup['error']}"
-                    }
+            # 备份当前文件：直接复制到所用备份文件的同一目录
+            timestamp = f"{time.time_ns():x}"
+            pre_restore_path = backup_file.parent / f"{config.name}.{timestamp}.prerestore"
+            try:
+                shutil.copyfile(config_path, pre_restore_path)
+            except (FileNotFoundError, NotADirectoryError):
+                # 当前配置文件不存在，无需备份
+                pre_restore_path = None
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"无法备份当前配置: {str(e)}"
+                }
             
-            # 恢复配置文件
-            shutil.copy2(backup_file, config_path)
+            # 恢复配置文件：原子替换，配置文件不会处于写了一半的状态，mtime 也随之更新
+            _write_atomic(config_path, backup_file.read_bytes())
             
             return {
                 "success": True,
                 "restored_path": str(config_path),
-                "backup_used": str(backup_file)
+                "backup_used": str(backup_file),
+                "pre_restore_backup": str(pre_restore_path) if pre_restore_path else None
             }
             
         except Exception as e:
@@ -378,8 +795,7 @@ class ConfigManager:
             output_path = Path(output_path)
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(template_content)
+            _write_atomic(output_path, template_content.encode('utf-8'))
             
             return {
                 "success": True,
@@ -395,67 +811,7 @@ class ConfigManager:
     
     def _generate_template_content(self, config: ConfigFile) -> str:
         """生成模板内容"""
-        templates = {
-            "test_config": '''
-{
-  "scenario_generator": {
-    "web_application": {
-      "base_response_time_ms": 150,
-      "base_throughput_rps": 100,
-      "base_error_rate": 0.02,
-      "base_cpu_usage": 0.45,
-      "base_memory_usage": 0.60,
-      "anomaly_probability": 0.05
-    },
-    "database": {
-      "base_query_time_ms": 25,
-      "base_connections": 50,
-      "base_cpu_usage": 0.35,
-      "base_memory_usage": 0.70,
-      "anomaly_probability": 0.03
-    }
-  }
-}
-''',
-            "project_configs": '''
-{
-  "basic_load_test": [
-    {
-      "type": "java",
-      "name": "basic-java-service",
-      "introduce_error": false,
-      "description": "基础Java微服务"
-    }
-  ]
-}
-''',
-            "ai_engine_default": '''
-# AI引擎配置模板
-app:
-  name: "AIOps AI Engine"
-  version: "1.0.0"
-  debug: false
-  host: "0.0.0.0"
-  port: 8000
-
-database:
-  primary:
-    type: "postgresql"
-    host: "localhost"
-    port: 5432
-    database: "aiops"
-    username: "aiops"
-    password: "your_password_here"
-
-redis:
-  host: "localhost"
-  port: 6379
-  password: ""
-  db: 0
-'''
-        }
-        
-        return templates.get(config.name.split('.')[0], f"# {config.description}\n# 请根据需要配置相关参数\n")
+        return _TEMPLATES.get(config.name.split('.')[0], f"# {config.description}\n# 请根据需要配置相关参数\n")
     
     def switch_environment(self, environment: str) -> Dict[str, Any]:
         """切换环境配置
@@ -467,19 +823,20 @@ redis:
             切换结果
         """
         results = []
+        self._sync_indexes()
         
-        # 获取环境相关的配置文件
-        env_configs = self.list_configs(environment=environment)
+        # 只取该环境专属的配置文件，环境索引中的通用("all")配置不参与切换；未指定环境时不过滤
+        candidates = self._by_env.get(environment, ()) if environment else self.config_registry.values()
+        env_configs = [c for c in candidates if c.environment != "all"]
         
         for config in env_configs:
-            if config.environment != "all":
-                # 这里可以实现环境配置的切换逻辑
-                # 例如：复制环境特定的配置文件到默认位置
-                results.append({
-                    "config": config.name,
-                    "status": "switched",
-                    "environment": environment
-                })
+            # 这里可以实现环境配置的切换逻辑
+            # 例如：复制环境特定的配置文件到默认位置
+            results.append({
+                "config": config.name,
+                "status": "switched",
+                "environment": environment
+            })
         
         return {
             "success": True,
@@ -488,10 +845,13 @@ redis:
             "details": results
         }
 
-def main():
-    """主函数"""
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行解析器，同一进程内只构建一次"""
     parser = argparse.ArgumentParser(description="AIOps配置文件管理工具")
     parser.add_argument("--base-path", default=".", help="基础路径")
+    parser.add_argument("--parse-cache", action="store_true",
+                        help=f"跨进程缓存验证结果，按文件内容哈希判断是否变化（{DEFAULT_PARSE_CACHE_PATH}）")
     
     subparsers = parser.add_subparsers(dest="command", help="可用命令")
     
@@ -499,6 +859,7 @@ def main():
     list_parser = subparsers.add_parser("list", help="列出配置文件")
     list_parser.add_argument("--category", help="按分类过滤")
     list_parser.add_argument("--environment", help="按环境过滤")
+    list_parser.add_argument("--validate", action="store_true", help="同时验证配置文件格式")
     
     # 验证配置文件
     validate_parser = subparsers.add_parser("validate", help="验证配置文件")
@@ -523,13 +884,18 @@ def main():
     env_parser = subparsers.add_parser("switch-env", help="切换环境配置")
     env_parser.add_argument("environment", choices=["development", "test", "production"], help="目标环境")
     
+    return parser
+
+def main():
+    """主函数"""
+    parser = _build_parser()
     args = parser.parse_args()
     
     if not args.command:
         parser.print_help()
         return
     
-    manager = ConfigManager(args.base_path)
+    manager = ConfigManager(args.base_path, DEFAULT_PARSE_CACHE_PATH if args.parse_cache else None)
     
     if args.command == "list":
         configs = manager.list_configs(args.category, args.environment)
@@ -541,6 +907,22 @@ def main():
             print(f"环境过滤: {args.environment}")
         print()
         
+        # 配置对象到键名、完整路径的映射
+        config_keys = {config: key for key, config in manager.config_registry.items()}
+        config_paths = {config: manager.get_config_path(config_keys[config]) for config in configs}
+        
+        # 每个所在目录只 scandir 一次，收集其中的文件名，代替逐个 exists() 检查
+        dir_entries = {}
+        for parent in {config_path.parent for config_path in config_paths.values()}:
+            try:
+                with os.scandir(parent) as entries:
+                    dir_entries[parent] = {entry.name for entry in entries}
+            except OSError:
+                dir_entries[parent] = set()
+        
+        # 需要时并发验证所列配置，状态改为显示验证结果
+        validation = manager.validate_all([config_keys[c] for c in configs]) if args.validate else {}
+        
         # 按分类分组显示
         categories = {}
         for config in configs:
@@ -551,7 +933,11 @@ def main():
         for category, category_configs in categories.items():
             print(f"📁 {category.upper()}")
             for config in category_configs:
-                status = "✅" if (Path(args.base_path) / config.path).exists() else "❌"
+                if args.validate:
+                    status = "✅" if validation[config_keys[config]]["valid"] else "❌"
+                else:
+                    config_path = config_paths[config]
+                    status = "✅" if config_path.name in dir_entries[config_path.parent] else "❌"
                 print(f"  {status} {config.name} - {config.description}")
                 print(f"     路径: {config.path}")
                 print(f"     格式: {config.format} | 环境: {config.environment}")
@@ -576,7 +962,7 @@ def main():
         if result["success"]:
             print("✅ 备份成功")
             print(f"备份路径: {result['backup_path']}")
-            print(f"时间戳: {result['timestamp']}")
+            print(f"时间戳: {result['timestamp']} (纳秒级 Unix 时间，十六进制)")
         else:
             print("❌ 备份失败")
             print(f"错误: {result['error']}")
@@ -588,6 +974,8 @@ def main():
         if result["success"]:
             print("✅ 恢复成功")
             print(f"恢复路径: {result['restored_path']}")
+            if result["pre_restore_backup"]:
+                print(f"恢复前备份: {result['pre_restore_backup']}")
         else:
             print("❌ 恢复失败")
             print(f"错误: {result['error']}")
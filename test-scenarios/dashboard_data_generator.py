@@ -12,16 +12,29 @@ Date: 2025-01-10
 
 import json
 import time
-import random
-import math
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
+from functools import lru_cache
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# 可选依赖
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba 不可用时的占位装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 
 class DataSourceType(Enum):
     """数据源类型枚举"""
@@ -91,6 +104,108 @@ class Dashboard:
     time_range: str = "1h"
 
 
+@njit(cache=True, fastmath=True)
+def _gen_random_walk(steps: np.ndarray, lo: float, hi: float, base: float) -> np.ndarray:
+    """
+    随机游走：逐步累加步长并截断在范围内
+    
+    Args:
+        steps: 每个时刻的步长
+        lo: 下界
+        hi: 上界
+        base: 起始值
+        
+    Returns:
+        游走序列
+    """
+    values = np.empty(steps.shape[0])
+    walk = base
+    for i in range(steps.shape[0]):
+        walk = min(hi, max(lo, walk + steps[i]))
+        values[i] = walk
+    return values
+
+
+@njit(cache=True, fastmath=True)
+def _gen_step(draws: np.ndarray, levels: np.ndarray, lo: float, hi: float, p: float) -> np.ndarray:
+    """
+    阶跃函数：draws 小于 p 时切换到对应档位（0-4），否则沿用上一档
+    
+    Args:
+        draws: [0, 1) 均匀随机数
+        levels: 候选档位
+        lo: 下界
+        hi: 上界
+        p: 切换概率
+        
+    Returns:
+        阶跃序列
+    """
+    values = np.empty(draws.shape[0])
+    level = 0
+    for i in range(draws.shape[0]):
+        if draws[i] < p:
+            level = levels[i]
+        values[i] = lo + (hi - lo) * level / 4
+    return values
+
+
+if NUMBA_AVAILABLE:
+    # 预热，把 JIT 编译开销挪到导入阶段（cache=True 时后续进程直接读缓存）
+    _gen_random_walk(np.zeros(1), 0.0, 1.0, 0.5)
+    _gen_step(np.ones(1), np.zeros(1, dtype=np.int64), 0.0, 1.0, 0.05)
+
+
+@lru_cache(maxsize=256)
+def _base_curve(pattern: TimeSeriesPattern, lo: float, hi: float,
+                n: int, interval_seconds: float) -> np.ndarray:
+    """
+    生成确定性模式加噪声前的基础曲线，结果只读，调用方需 copy 后再修改
+    
+    Args:
+        pattern: 时间序列模式（不含随机游走、尖峰、阶跃）
+        lo: 下界
+        hi: 上界
+        n: 点数
+        interval_seconds: 采样间隔（秒）
+        
+    Returns:
+        基础曲线
+    """
+    value_range = hi - lo
+    base_value = (lo + hi) / 2
+    # 小时为单位的时间轴
+    t = np.arange(n) * interval_seconds / 3600.0
+    
+    if pattern == TimeSeriesPattern.LINEAR:
+        # 线性增长，24小时内从最小到最大
+        values = np.clip(lo + value_range / 24 * t, lo, hi)
+    
+    elif pattern == TimeSeriesPattern.SINE:
+        # 正弦波，24小时周期
+        values = base_value + value_range / 2 * np.sin(2 * np.pi * t / 24)
+    
+    elif pattern == TimeSeriesPattern.COSINE:
+        # 余弦波，24小时周期
+        values = base_value + value_range / 2 * np.cos(2 * np.pi * t / 24)
+    
+    elif pattern == TimeSeriesPattern.EXPONENTIAL:
+        # 指数增长（有限制），每小时10%增长
+        values = np.minimum(lo * np.exp(0.1 * t), hi)
+    
+    elif pattern == TimeSeriesPattern.SEASONAL:
+        # 季节性模式（日周期 + 周周期）
+        values = (base_value
+                  + value_range * 0.3 * np.sin(2 * np.pi * t / 24)
+                  + value_range * 0.2 * np.sin(2 * np.pi * t / (24 * 7)))
+    
+    else:
+        values = np.full(n, base_value, dtype=float)
+    
+    values.flags.writeable = False
+    return values
+
+
 class DashboardDataGenerator:
     """仪表板数据生成器"""
     
@@ -106,6 +221,7 @@ class DashboardDataGenerator:
         self.dashboards = self._create_default_dashboards()
         self.data_cache = {}  # 数据缓存
         self.running = False
+        self._rng = np.random.default_rng()
         
     def _get_default_config(self) -> Dict:
         """获取默认配置"""
@@ -401,101 +517,51 @@ class DashboardDataGenerator:
         if interval_seconds is None:
             interval_seconds = metric.sample_interval_seconds
         
-        points = []
-        current_time = start_time
-        base_value = (metric.min_value + metric.max_value) / 2
+        total_seconds = (end_time - start_time).total_seconds()
+        if total_seconds < 0:
+            return []
         
-        # 用于随机游走的状态
-        random_walk_value = base_value
+        rng = self._rng
+        n = int(total_seconds // interval_seconds) + 1
+        lo, hi = metric.min_value, metric.max_value
+        value_range = hi - lo
+        base_value = (lo + hi) / 2
+        pattern = metric.pattern
         
-        # 用于阶跃函数的状态
-        step_level = 0
-        step_change_probability = 0.05
+        # 随机模式每次重新生成，确定性模式复用缓存的基础曲线
+        if pattern == TimeSeriesPattern.RANDOM_WALK:
+            # 随机游走，逐步截断在范围内
+            steps = rng.uniform(-1, 1, n) * value_range * 0.02
+            values = _gen_random_walk(steps, float(lo), float(hi), float(base_value))
         
-        while current_time <= end_time:
-            # 计算时间相关的参数
-            time_offset = (current_time - start_time).total_seconds()
-            time_normalized = time_offset / 3600  # 小时为单位
-            
-            # 根据模式生成值
-            if metric.pattern == TimeSeriesPattern.CONSTANT:
-                value = base_value
-            
-            elif metric.pattern == TimeSeriesPattern.LINEAR:
-                # 线性增长
-                slope = (metric.max_value - metric.min_value) / 24  # 24小时内从最小到最大
-                value = metric.min_value + slope * time_normalized
-                value = max(metric.min_value, min(metric.max_value, value))
-            
-            elif metric.pattern == TimeSeriesPattern.SINE:
-                # 正弦波，24小时周期
-                amplitude = (metric.max_value - metric.min_value) / 2
-                value = base_value + amplitude * math.sin(2 * math.pi * time_normalized / 24)
-            
-            elif metric.pattern == TimeSeriesPattern.COSINE:
-                # 余弦波，24小时周期
-                amplitude = (metric.max_value - metric.min_value) / 2
-                value = base_value + amplitude * math.cos(2 * math.pi * time_normalized / 24)
-            
-            elif metric.pattern == TimeSeriesPattern.RANDOM_WALK:
-                # 随机游走
-                change = random.uniform(-1, 1) * (metric.max_value - metric.min_value) * 0.02
-                random_walk_value += change
-                random_walk_value = max(metric.min_value, min(metric.max_value, random_walk_value))
-                value = random_walk_value
-            
-            elif metric.pattern == TimeSeriesPattern.SPIKE:
-                # 基础值加上偶尔的尖峰
-                value = base_value
-                if random.random() < 0.05:  # 5%概率出现尖峰
-                    spike_magnitude = random.uniform(0.5, 1.0) * (metric.max_value - base_value)
-                    value += spike_magnitude
-            
-            elif metric.pattern == TimeSeriesPattern.STEP:
-                # 阶跃函数
-                if random.random() < step_change_probability:
-                    step_level = random.randint(0, 4)
-                value = metric.min_value + (metric.max_value - metric.min_value) * step_level / 4
-            
-            elif metric.pattern == TimeSeriesPattern.EXPONENTIAL:
-                # 指数增长（有限制）
-                growth_rate = 0.1  # 每小时10%增长
-                value = metric.min_value * math.exp(growth_rate * time_normalized)
-                value = min(metric.max_value, value)
-            
-            elif metric.pattern == TimeSeriesPattern.SEASONAL:
-                # 季节性模式（日周期 + 周周期）
-                daily_amplitude = (metric.max_value - metric.min_value) * 0.3
-                weekly_amplitude = (metric.max_value - metric.min_value) * 0.2
-                
-                daily_component = daily_amplitude * math.sin(2 * math.pi * time_normalized / 24)
-                weekly_component = weekly_amplitude * math.sin(2 * math.pi * time_normalized / (24 * 7))
-                
-                value = base_value + daily_component + weekly_component
-            
-            else:
-                value = base_value
-            
-            # 添加噪声
-            if metric.noise_level > 0:
-                noise_range = (metric.max_value - metric.min_value) * metric.noise_level
-                noise = random.uniform(-noise_range/2, noise_range/2)
-                value += noise
-            
-            # 确保值在范围内
-            value = max(metric.min_value, min(metric.max_value, value))
-            
-            # 创建数据点
-            point = TimeSeriesPoint(
-                timestamp=current_time,
-                value=round(value, 3),
-                labels=metric.labels.copy()
-            )
-            
-            points.append(point)
-            current_time += timedelta(seconds=interval_seconds)
+        elif pattern == TimeSeriesPattern.SPIKE:
+            # 基础值加上偶尔的尖峰（5%概率）
+            values = np.full(n, base_value, dtype=float)
+            mask = rng.random(n) < 0.05
+            values[mask] += rng.uniform(0.5, 1.0, int(mask.sum())) * (hi - base_value)
+        
+        elif pattern == TimeSeriesPattern.STEP:
+            # 阶跃函数：按概率切换档位，其余时刻沿用上一档
+            values = _gen_step(rng.random(n), rng.integers(0, 5, n), float(lo), float(hi), 0.05)
         
-        return points
+        else:
+            values = _base_curve(pattern, lo, hi, n, interval_seconds).copy()
+        
+        # 添加噪声
+        if metric.noise_level > 0:
+            noise_range = value_range * metric.noise_level
+            values += rng.uniform(-noise_range / 2, noise_range / 2, n)
+        
+        # 确保值在范围内
+        np.clip(values, lo, hi, out=values)
+        
+        # 只在边界处转换为数据点
+        step = timedelta(seconds=interval_seconds)
+        labels = metric.labels
+        return [
+            TimeSeriesPoint(timestamp=start_time + step * i, value=round(value, 3), labels=labels.copy())
+            for i, value in enumerate(values.tolist())
+        ]
     
     def generate_dashboard_data(self, dashboard_id: str, 
                                hours: int = 24,